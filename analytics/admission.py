@@ -0,0 +1,269 @@
+import json
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection
+from rest_framework.exceptions import APIException, ParseError, Throttled
+from rest_framework.response import Response
+
+from .caching import versioned_cache_key
+
+# Overridable with settings.ANALYTICS_ADMISSION
+DEFAULTS = {
+    'MAX_CONCURRENT': 4,            # Requests per endpoint at once, across all workers
+    'HEAVY_ROWS': 250_000,          # Estimated scanned rows that make a request heavy
+    'MAX_HEAVY': 1,                 # Heavy requests at once, across endpoints and workers
+    'STATEMENT_TIMEOUT_MS': 10_000, # PostgreSQL statement_timeout while a request runs
+    'RETRY_AFTER': 2,               # Seconds, sent as Retry-After on 429/503
+}
+
+REJECTION_REASONS = ["busy", "heavy", "timeout"]
+REJECTION_KEY = "admission_rejections_{endpoint}_{reason}"
+
+# SQLSTATE query_canceled, raised when statement_timeout fires
+QUERY_CANCELED = "57014"
+
+# First key of the two-int advisory lock form, reserved for admission slots
+ADVISORY_LOCK_SPACE = 0x41444D
+# Slot number takes the low 8 bits of the second key
+MAX_SLOTS = 256
+
+
+def admission_setting(name):
+    return getattr(settings, 'ANALYTICS_ADMISSION', {}).get(name, DEFAULTS[name])
+
+
+class EndpointBusy(APIException):
+    status_code = 503
+    default_detail = "Too many requests for this endpoint right now, retry shortly."
+    default_code = 'endpoint_busy'
+
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+
+class SlotPool:
+    """
+    `size` slots named `name`, shared by every worker process through
+    PostgreSQL session-level advisory locks. Slots are freed by release(), or
+    by the server when a dead worker's connection goes away.
+    """
+
+    def __init__(self, name, size):
+        base = zlib.crc32(name.encode()) & 0x7FFFFF
+        self.keys = [(base << 8) | slot for slot in range(min(size, MAX_SLOTS))]
+
+    def _lock_call(self, function, key):
+        # Raw cursor: not logged and not subject to the request's execute wrappers
+        connection.ensure_connection()
+        with connection.connection.cursor() as cursor:
+            cursor.execute(f"SELECT {function}(%s, %s)", [ADVISORY_LOCK_SPACE, key])
+            return cursor.fetchone()[0]
+
+    def acquire(self):
+        """Returns the key of a free slot, or None when all of them are taken"""
+        for key in self.keys:
+            if self._lock_call("pg_try_advisory_lock", key):
+                return key
+        return None
+
+    def release(self, key):
+        try:
+            self._lock_call("pg_advisory_unlock", key)
+        except DatabaseError:
+            # Lost connection: the server already dropped its locks
+            pass
+
+
+def record_rejection(endpoint, reason):
+    """Counts a rejection in the shared cache so every worker's rejections add up"""
+    key = REJECTION_KEY.format(endpoint=endpoint, reason=reason)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def rejection_counts(endpoints):
+    """{endpoint: {reason: count}} for the given endpoint names"""
+    keys = {
+        (endpoint, reason): REJECTION_KEY.format(endpoint=endpoint, reason=reason)
+        for endpoint in endpoints for reason in REJECTION_REASONS
+    }
+    stored = cache.get_many(list(keys.values()))
+    return {
+        endpoint: {reason: stored.get(keys[endpoint, reason], 0) for reason in REJECTION_REASONS}
+        for endpoint in endpoints
+    }
+
+
+def estimate_rows(queryset):
+    """
+    Planner estimate of the rows `queryset` scans (EXPLAIN without ANALYZE, so
+    nothing runs). Estimates are cached per statement and dataset version.
+    Returns None off PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+
+    sql, params = queryset.values('id').query.sql_with_params()
+    cache_key = versioned_cache_key("admission_rows", sql=sql, params=params)
+    rows = cache.get(cache_key)
+    if rows is None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            raw = cursor.fetchone()[0]
+        rows = int((json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]["Plan Rows"])
+        cache.set(cache_key, rows, 600)  # Cache for 10 minutes
+    return rows
+
+
+def _sqlstate(error):
+    for exc in (error, error.__cause__):
+        code = getattr(exc, 'sqlstate', None) or getattr(exc, 'pgcode', None)
+        if code:
+            return code
+    return None
+
+
+class StatementGuard:
+    """
+    connection.execute_wrapper that sets statement_timeout before the first
+    query of a request (cached responses never touch the database) and notes
+    whether any query was cancelled by it.
+    """
+
+    def __init__(self, timeout_ms):
+        self.timeout_ms = timeout_ms
+        self.applied = False
+        self.timed_out = False
+
+    def __call__(self, execute, sql, params, many, context):
+        db = context['connection']
+        if not self.applied and db.vendor == 'postgresql' and self.timeout_ms:
+            # Raw cursor: not logged, and safe next to server-side cursors
+            with db.connection.cursor() as cursor:
+                cursor.execute(f"SET statement_timeout = {int(self.timeout_ms)}")
+            self.applied = True
+
+        try:
+            return execute(sql, params, many, context)
+        except DatabaseError as e:
+            if _sqlstate(e) == QUERY_CANCELED:
+                self.timed_out = True
+            raise
+
+    def reset(self):
+        if not self.applied or connection.connection is None:
+            return
+        try:
+            with connection.connection.cursor() as cursor:
+                cursor.execute("RESET statement_timeout")
+        except Exception:
+            # A broken connection is discarded by Django anyway
+            pass
+
+
+class AdmissionControlMixin:
+    """
+    Admission control for APIViews, checked before the handler runs:
+
+    - at most `max_concurrent` requests per endpoint run at once across all
+      workers, extra ones get 503 + Retry-After right away instead of queueing
+      for a DB connection
+    - if `cost_queryset()` returns a queryset whose estimated size is above
+      HEAVY_ROWS, the request also needs one of MAX_HEAVY shared heavy slots,
+      else 429; filters the ORM can't use (e.g. a malformed date) get 400
+    - every statement runs under `statement_timeout_ms`; a cancelled query
+      turns the response into 503
+
+    Slots are PostgreSQL advisory locks, so on other databases only the cost
+    parsing applies. Rejections are counted in the cache. Views that almost
+    always answer from the cache set `concurrency_limited = False`: a slot
+    would cost them a connection and lock round trips on every hit.
+    """
+
+    concurrency_limited = True
+    max_concurrent = None
+    statement_timeout_ms = None
+
+    def cost_queryset(self, request):
+        """Queryset whose size decides whether this request is heavy (None: never heavy)"""
+        return None
+
+    def admission_endpoint(self, request):
+        return getattr(request.resolver_match, 'url_name', None) or type(self).__name__
+
+    def _take_slot(self, pool):
+        """True if a slot was taken (or slots can't be enforced here), False if the pool is full"""
+        if connection.vendor != 'postgresql':
+            return True
+        try:
+            key = pool.acquire()
+        except DatabaseError as e:
+            # The handler reports an unavailable database itself
+            print(f"Error acquiring admission slot: {str(e)}")
+            return True
+        if key is None:
+            return False
+        self._admission_slots.append((pool, key))
+        return True
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        endpoint = self.admission_endpoint(request)
+        retry_after = admission_setting('RETRY_AFTER')
+
+        if self.concurrency_limited:
+            limit = self.max_concurrent or admission_setting('MAX_CONCURRENT')
+            if not self._take_slot(SlotPool(f"endpoint:{endpoint}", limit)):
+                record_rejection(endpoint, "busy")
+                raise EndpointBusy(wait=retry_after)
+
+        try:
+            queryset = self.cost_queryset(request)
+            rows = estimate_rows(queryset) if queryset is not None else None
+        except ValidationError as e:
+            raise ParseError(detail="; ".join(e.messages))
+        except ValueError as e:
+            raise ParseError(detail=str(e))
+        except DatabaseError as e:
+            print(f"Error estimating cost for {endpoint}: {str(e)}")
+            rows = None
+
+        if rows is not None and rows > admission_setting('HEAVY_ROWS'):
+            if not self._take_slot(SlotPool("heavy", admission_setting('MAX_HEAVY'))):
+                record_rejection(endpoint, "heavy")
+                raise Throttled(
+                    wait=retry_after,
+                    detail=f"Query would scan about {rows:,} rows and the server is busy with other large "
+                           f"queries. Narrow the filters (weeks, cooldown_weeks, dates) or retry later."
+                )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        guard = getattr(self, '_statement_guard', None)
+        if guard is not None and guard.timed_out:
+            record_rejection(self.admission_endpoint(request), "timeout")
+            response = Response(
+                {"error": "Query took too long, try narrower filters"},
+                status=503,
+                headers={'Retry-After': str(admission_setting('RETRY_AFTER'))}
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        self._admission_slots = []
+        self._statement_guard = StatementGuard(
+            self.statement_timeout_ms or admission_setting('STATEMENT_TIMEOUT_MS')
+        )
+        try:
+            with connection.execute_wrapper(self._statement_guard):
+                return super().dispatch(request, *args, **kwargs)
+        finally:
+            self._statement_guard.reset()
+            for pool, key in reversed(self._admission_slots):
+                pool.release(key)
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count, Max
+
+from .models import DataVersion, TradingData
+
+# Version tokens live in the DataVersion table, fronted by the cache
+DATASET_VERSION_KEY = "dataset_version"
+
+# Bumped per (holding_weeks, cooldown_setting) slice when rows change in place
+SLICE_VERSION_KEY = "slice_version_{weeks}_{cooldown}"
+# Bumped on any in-place change, for keys spanning several slices
+SLICE_GENERATION_KEY = "slice_generation"
+
+# Background recomputation of stale entries (see get_or_refresh)
+REFRESH_WORKERS = 2
+REFRESH_LOCK_TIMEOUT = 300
+
+# Fixed-parameter view caches derived from a slice
+SLICE_VIEW_KEYS = [
+    "sector_performance_{weeks}_{cooldown}",
+    "confidence_trend_{cooldown}",
+    "sector_duration_bubbles_{cooldown}",
+]
+
+
+def _read_version(name, initial=None):
+    """
+    Returns the stored version `name`: from the cache when present, otherwise
+    from DataVersion (re-caching it). If it was never stored, `initial()` is
+    persisted, or "0" is returned for counters that haven't been bumped yet.
+    """
+    value = cache.get(name)
+    if value is not None:
+        return value
+
+    value = DataVersion.objects.filter(name=name).values_list('value', flat=True).first()
+    if value is None:
+        if initial is None:
+            value = "0"
+        else:
+            # get_or_create: a concurrent first read keeps whichever value won
+            value = DataVersion.objects.get_or_create(name=name, defaults={'value': initial()})[0].value
+    cache.set(name, value, None)
+    return value
+
+
+def _write_version(name, value):
+    DataVersion.objects.update_or_create(name=name, defaults={'value': value})
+    cache.set(name, value, None)
+    return value
+
+
+def _increment_version(name):
+    with transaction.atomic():
+        row, _ = DataVersion.objects.select_for_update().get_or_create(name=name, defaults={'value': "0"})
+        row.value = str(int(row.value) + 1)
+        row.save(update_fields=['value'])
+    cache.set(name, row.value, None)
+    return row.value
+
+
+def _derive_dataset_version():
+    stats = TradingData.objects.aggregate(rows=Count('id'), last_id=Max('id'))
+    return f"{stats['rows'] or 0}-{stats['last_id'] or 0}"
+
+
+def get_dataset_version():
+    """
+    Returns a token identifying the currently loaded dataset.
+    ingest_data.py bumps it after every load; if nothing has been recorded yet
+    it is derived from the table contents once and kept until the next bump.
+    """
+    return _read_version(DATASET_VERSION_KEY, _derive_dataset_version)
+
+
+def bump_dataset_version():
+    """Marks the dataset as changed so every versioned cache entry is bypassed"""
+    return _write_version(DATASET_VERSION_KEY, f"{int(time.time() * 1000)}")
+
+
+def invalidate_slices(slices):
+    """
+    Invalidates cached results for the given (holding_weeks, cooldown_setting)
+    slices only, e.g. after an mcap reclassification. Keys for other slices
+    stay valid.
+    """
+    stale_keys = set()
+    for weeks, cooldown in slices:
+        _increment_version(SLICE_VERSION_KEY.format(weeks=weeks, cooldown=cooldown))
+        stale_keys.update(k.format(weeks=weeks, cooldown=cooldown) for k in SLICE_VIEW_KEYS)
+
+    _increment_version(SLICE_GENERATION_KEY)
+    mark_stale(stale_keys)
+
+
+def _slice_token(params):
+    weeks, cooldown = params.get("weeks"), params.get("cooldown_weeks")
+    if isinstance(weeks, int) and isinstance(cooldown, int):
+        return _read_version(SLICE_VERSION_KEY.format(weeks=weeks, cooldown=cooldown))
+    return f"g{_read_version(SLICE_GENERATION_KEY)}"
+
+
+def versioned_cache_key(prefix, **params):
+    """
+    Builds a cache key for `prefix` that changes whenever the dataset, the
+    slice named by `weeks`/`cooldown_weeks` or the (normalized) parameters
+    change. Parameter order and value types don't matter.
+    """
+    normalized = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.md5(normalized.encode()).hexdigest()[:16]
+    return f"{prefix}:{get_dataset_version()}:{_slice_token(params)}:{digest}"
+
+
+_refresh_pool = None
+_refresh_slots = threading.BoundedSemaphore(REFRESH_WORKERS)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _get_refresh_pool():
+    global _refresh_pool
+    with _refreshing_lock:
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+    return _refresh_pool
+
+
+def _store(key, value, soft_timeout, version):
+    # No hard timeout: an expired entry is still served while it is refreshed
+    cache.set(key, ("swr", time.time() + soft_timeout, version, value), None)
+
+
+def _is_envelope(entry):
+    return isinstance(entry, tuple) and len(entry) == 4 and entry[0] == "swr"
+
+
+def mark_stale(keys):
+    """
+    Expires stale-while-revalidate entries without dropping them: the next
+    request still gets the old value and triggers a background refresh.
+    Anything else under these keys is deleted.
+    """
+    for key in keys:
+        entry = cache.get(key)
+        if _is_envelope(entry):
+            _, _, version, value = entry
+            cache.set(key, ("swr", 0, version, value), None)
+        elif entry is not None:
+            cache.delete(key)
+
+
+def _refresh(key, compute, soft_timeout):
+    try:
+        # Read first: a bump during compute() must leave the new entry stale
+        version = get_dataset_version()
+        _store(key, compute(), soft_timeout, version)
+    except Exception as e:
+        print(f"Error refreshing cache key {key}: {str(e)}")
+    finally:
+        cache.delete(f"{key}:refreshing")
+        with _refreshing_lock:
+            _refreshing.discard(key)
+        _refresh_slots.release()
+        # Worker threads get their own DB connections; don't leak them
+        connections.close_all()
+
+
+def _schedule_refresh(key, compute, soft_timeout):
+    """Starts a background refresh unless one is already running for `key` or the pool is busy"""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+
+    # Other processes sharing the cache take the same key via cache.add
+    claimed = _refresh_slots.acquire(blocking=False)
+    if claimed and not cache.add(f"{key}:refreshing", 1, REFRESH_LOCK_TIMEOUT):
+        _refresh_slots.release()
+        claimed = False
+    if not claimed:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+        return False
+
+    _get_refresh_pool().submit(_refresh, key, compute, soft_timeout)
+    return True
+
+
+def get_or_refresh(key, compute, soft_timeout):
+    """
+    Stale-while-revalidate lookup. Entries carry a soft expiry: a fresh entry
+    is returned as is, a stale one (soft expiry passed or the dataset version
+    changed) is still returned immediately while `compute` runs on a small
+    background pool, one refresh per key at a time. Only a missing entry is
+    computed in the request.
+    """
+    entry = cache.get(key)
+    version = get_dataset_version()
+
+    if _is_envelope(entry):
+        _, soft_expires, entry_version, value = entry
+        if soft_expires <= time.time() or entry_version != version:
+            _schedule_refresh(key, compute, soft_timeout)
+        return value
+
+    value = compute()
+    _store(key, value, soft_timeout, version)
+    return value
@@ -0,0 +1,100 @@
+from .lazy import np
+
+# Normal quantiles for the confidence levels we expose (scipy not available)
+Z_SCORES = {0.80: 1.2816, 0.90: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_SEED = 42
+
+# Below this many samples (or with 0%/100% observed) a percentile bootstrap of
+# Binomial(n, p) collapses to a zero-width interval, so Wilson is used instead
+MIN_BOOTSTRAP_SAMPLES = 30
+
+# Upper bound on groups x resamples drawn at once, keeps peak memory ~16MB
+MAX_BATCH_CELLS = 2_000_000
+
+
+def wilson_interval(successes, totals, confidence=0.95):
+    """
+    Wilson score interval for many binomial proportions at once.
+    Returns (low, high) arrays in the 0-1 range; groups with no samples get NaN.
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+    z = Z_SCORES[confidence]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = successes / totals
+        denom = 1 + z**2 / totals
+        centre = (p + z**2 / (2 * totals)) / denom
+        margin = z * np.sqrt(p * (1 - p) / totals + z**2 / (4 * totals**2)) / denom
+
+    low = np.clip(centre - margin, 0.0, 1.0)
+    high = np.clip(centre + margin, 0.0, 1.0)
+    empty = totals <= 0
+    low[empty] = np.nan
+    high[empty] = np.nan
+    return low, high
+
+
+def bootstrap_interval(successes, totals, confidence=0.95,
+                       n_resamples=DEFAULT_RESAMPLES, seed=DEFAULT_SEED):
+    """
+    Percentile bootstrap interval for many binomial proportions at once.
+
+    Resampling n outcomes with replacement from a group with success rate p is
+    a Binomial(n, p) draw, so every group is resampled in a single (groups x
+    resamples) matrix instead of looping over groups. Groups are processed in
+    row batches only to cap memory; the seeded generator keeps results
+    reproducible for the same input order.
+    """
+    successes = np.asarray(successes, dtype=np.int64)
+    totals = np.asarray(totals, dtype=np.int64)
+    n_groups = len(totals)
+
+    low = np.full(n_groups, np.nan)
+    high = np.full(n_groups, np.nan)
+    if n_groups == 0:
+        return low, high
+
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2
+    safe_totals = np.maximum(totals, 1)
+    rates = successes / safe_totals
+    batch = max(1, MAX_BATCH_CELLS // n_resamples)
+
+    for start in range(0, n_groups, batch):
+        stop = min(start + batch, n_groups)
+        n = safe_totals[start:stop, None]
+        draws = rng.binomial(n, rates[start:stop, None], size=(stop - start, n_resamples)) / n
+        low[start:stop], high[start:stop] = np.quantile(draws, [alpha, 1 - alpha], axis=1)
+
+    empty = totals <= 0
+    low[empty] = np.nan
+    high[empty] = np.nan
+    return low, high
+
+
+def success_rate_intervals(successes, totals, method="bootstrap", confidence=0.95):
+    """
+    Dispatches to the requested interval method, returning percentages.
+    Bootstrap falls back to Wilson for small groups and for groups with no
+    successes or no failures, where resampling can't produce any spread.
+    """
+    if confidence not in Z_SCORES:
+        raise ValueError(f"confidence must be one of {sorted(Z_SCORES)}")
+
+    if method == "wilson":
+        low, high = wilson_interval(successes, totals, confidence)
+    elif method == "bootstrap":
+        low, high = bootstrap_interval(successes, totals, confidence)
+        successes = np.asarray(successes, dtype=np.int64)
+        totals = np.asarray(totals, dtype=np.int64)
+        degenerate = (totals < MIN_BOOTSTRAP_SAMPLES) | (successes <= 0) | (successes >= totals)
+        if degenerate.any():
+            w_low, w_high = wilson_interval(successes[degenerate], totals[degenerate], confidence)
+            low[degenerate], high[degenerate] = w_low, w_high
+    else:
+        raise ValueError("method must be 'bootstrap' or 'wilson'")
+
+    return np.round(low * 100, 1), np.round(high * 100, 1)
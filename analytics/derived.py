@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from .models import RETURN_BUCKET_EDGES, RETURN_BUCKET_LABELS
+
+# Index -1 (below the first edge, or NULL) maps onto the trailing None
+_BUCKET_LOOKUP = np.array(RETURN_BUCKET_LABELS + [None], dtype=object)
+
+
+def add_derived_columns(df, duration="duration", returns="return_percentage"):
+    """
+    Adds the stored derived TradingData columns to a frame in one vectorized pass.
+    NaN/inf returns (quarantined by ingest validation) never count as a success.
+    """
+    ret = pd.to_numeric(df[returns], errors="coerce").astype(np.float64)
+    ret = ret.where(np.isfinite(ret))
+    df[returns] = ret
+
+    df["duration_rounded"] = np.round(pd.to_numeric(df[duration], errors="coerce")).astype(int)
+
+    values = ret.to_numpy()
+    with np.errstate(invalid="ignore"):
+        codes = np.searchsorted(RETURN_BUCKET_EDGES, values, side="right") - 1
+        codes = np.where(values >= RETURN_BUCKET_EDGES[0], codes, -1)
+        # Explicit object dtype keeps None (pandas would infer a str column with NaN)
+        df["return_bucket"] = pd.Series(_BUCKET_LOOKUP[codes], index=df.index, dtype=object)
+        df["is_success"] = values > 0
+        df["is_big_win"] = values >= RETURN_BUCKET_EDGES[0]
+
+    return df
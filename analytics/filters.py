@@ -0,0 +1,95 @@
+import math
+
+from .models import TradingData
+
+
+def parse_filters(params):
+    """
+    Normalizes the dashboard filter query params into a plain dict.
+    "All" / empty values become None so equivalent requests share a cache key.
+    """
+    sector = params.get("sector")
+    mcap = params.get("mcap")
+
+    return {
+        "weeks": int(params.get("weeks", 52)),
+        "cooldown_weeks": int(params.get("cooldown_weeks", 52)),
+        "start_date": params.get("start_date") or None,
+        "end_date": params.get("end_date") or None,
+        "sector": sector if sector and sector != "All" else None,
+        "mcap": mcap if mcap and mcap != "All" else None,
+    }
+
+
+def filter_queryset(filters, queryset=None):
+    """Applies parsed filters to a TradingData queryset"""
+    if queryset is None:
+        queryset = TradingData.objects.all()
+
+    # holding_weeks + cooldown_setting hit the composite index
+    if filters.get("weeks") is not None:
+        queryset = queryset.filter(holding_weeks=filters["weeks"])
+    if filters.get("cooldown_weeks") is not None:
+        queryset = queryset.filter(cooldown_setting=filters["cooldown_weeks"])
+
+    if filters.get("start_date"):
+        queryset = queryset.filter(breakout_date__gte=filters["start_date"])
+    if filters.get("end_date"):
+        queryset = queryset.filter(breakout_date__lte=filters["end_date"])
+    if filters.get("sector"):
+        queryset = queryset.filter(sector=filters["sector"])
+    if filters.get("mcap"):
+        queryset = queryset.filter(mcap_category=filters["mcap"])
+
+    return queryset
+
+
+def parse_int_list(value, default=None, limit=None):
+    """
+    Parses "20,26,52", "20-104" or "20-104:4" (range with step) into a sorted
+    list of unique ints. Raises ValueError for malformed input or too many values.
+    """
+    if not value:
+        return list(default or [])
+
+    result = set()
+    for part in str(value).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            span, _, step = part.partition(":")
+            start, end = (int(x) for x in span.split("-", 1))
+            step = int(step or 1)
+            if step < 1:
+                raise ValueError(f"Step must be a positive integer, got {step}")
+            # len(range) is computed without expanding it, so huge spans fail fast
+            values = range(start, end + 1, step)
+            if limit and len(values) > limit:
+                raise ValueError(f"At most {limit} values allowed, got {len(values)}")
+            result.update(values)
+        else:
+            result.add(int(part))
+        if limit and len(result) > limit:
+            raise ValueError(f"At most {limit} values allowed, got {len(result)}+")
+
+    values = sorted(result)
+    if limit and len(values) > limit:
+        raise ValueError(f"At most {limit} values allowed, got {len(values)}")
+    return values
+
+
+def parse_float_list(value, default=None, limit=None):
+    """
+    Parses "20,40,62.5" into a list of finite floats, keeping the given order.
+    Raises ValueError for malformed input or too many values.
+    """
+    if not value:
+        return list(default or [])
+
+    values = [float(part) for part in str(value).split(",") if part.strip()]
+    if not all(math.isfinite(v) for v in values):
+        raise ValueError("Values must be finite numbers")
+    if limit and len(values) > limit:
+        raise ValueError(f"At most {limit} values allowed, got {len(values)}")
+    return values
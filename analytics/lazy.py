@@ -0,0 +1,29 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Stands in for a heavy module (pandas, numpy) and imports it on first
+    attribute access, so worker boot and manage.py commands that never touch
+    it don't pay the import cost.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        value = getattr(self._module, attr)
+        # Cache on the proxy so later lookups skip __getattr__
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+np = LazyModule("numpy")
+pd = LazyModule("pandas")
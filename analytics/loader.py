@@ -0,0 +1,99 @@
+from django.db import connections
+
+from .lazy import np, pd
+
+# Compact dtypes for TradingData columns loaded into frames.
+# "category" columns are stored as integer codes plus one copy of each label.
+FIELD_DTYPES = {
+    'duration': 'float32',
+    'return_percentage': 'float32',
+    'holding_weeks': 'int16',
+    'cooldown_setting': 'int16',
+    'duration_rounded': 'int16',
+    'is_success': 'bool',
+    'is_big_win': 'bool',
+    'breakout_date': 'datetime64[D]',
+    'symbol': 'category',
+    'company': 'category',
+    'sector': 'category',
+    'mcap_category': 'category',
+    'return_bucket': 'category',
+}
+
+BATCH_SIZE = 10_000
+
+
+class _CategoryColumn:
+    """Accumulates integer codes for a string column, one label copy per value"""
+
+    def __init__(self, capacity):
+        self.codes = np.empty(capacity, dtype=np.int32)
+        self.lookup = {}
+
+    def resize(self, capacity):
+        self.codes = np.resize(self.codes, capacity)
+
+    def put(self, start, values):
+        lookup = self.lookup
+        self.codes[start:start + len(values)] = [
+            -1 if v is None else lookup.setdefault(v, len(lookup)) for v in values
+        ]
+
+    def finish(self, size):
+        # Sort labels so groupby/pivot output keeps the same order as plain strings
+        labels = np.array(list(self.lookup), dtype=object)
+        order = np.argsort(labels, kind='stable')
+        remap = np.empty(len(order) + 1, dtype=np.int32)
+        remap[order] = np.arange(len(order), dtype=np.int32)
+        remap[-1] = -1
+        codes = remap[self.codes[:size]]
+        return pd.Categorical.from_codes(codes, categories=labels[order])
+
+
+class _ArrayColumn:
+    def __init__(self, capacity, dtype):
+        self.values = np.empty(capacity, dtype=dtype)
+
+    def resize(self, capacity):
+        self.values = np.resize(self.values, capacity)
+
+    def put(self, start, values):
+        self.values[start:start + len(values)] = values
+
+    def finish(self, size):
+        return self.values[:size].copy() if size < len(self.values) else self.values
+
+
+def load_frame(queryset, fields, batch_size=BATCH_SIZE):
+    """
+    Loads `fields` of a TradingData queryset into a DataFrame without building
+    a dict per row. Rows are streamed from a server-side cursor in batches and
+    written straight into typed NumPy arrays (see FIELD_DTYPES).
+    """
+    sql, params = queryset.values_list(*fields).query.sql_with_params()
+
+    capacity = batch_size
+    columns = [
+        _CategoryColumn(capacity) if FIELD_DTYPES.get(f, 'float64') == 'category'
+        else _ArrayColumn(capacity, FIELD_DTYPES.get(f, 'float64'))
+        for f in fields
+    ]
+
+    size = 0
+    with connections[queryset.db].chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+
+            if size + len(rows) > capacity:
+                capacity = max(capacity * 2, size + len(rows))
+                for column in columns:
+                    column.resize(capacity)
+
+            for column, values in zip(columns, zip(*rows)):
+                column.put(size, values)
+            size += len(rows)
+
+    return pd.DataFrame({f: column.finish(size) for f, column in zip(fields, columns)})
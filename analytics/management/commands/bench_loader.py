@@ -0,0 +1,50 @@
+import time
+import tracemalloc
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from analytics.loader import load_frame
+from analytics.models import TradingData
+
+
+class Command(BaseCommand):
+    help = 'Compares peak memory of values() -> DataFrame against the typed cursor loader'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, nargs='*', default=[26, 52, 78, 104, 156, 208])
+        parser.add_argument('--cooldown', type=int, default=52)
+        parser.add_argument(
+            '--fields', nargs='*',
+            default=['sector', 'mcap_category', 'holding_weeks', 'is_success', 'duration', 'return_percentage']
+        )
+
+    def measure(self, label, load):
+        tracemalloc.start()
+        started = time.perf_counter()
+        df = load()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        frame_size = df.memory_usage(deep=True).sum()
+        self.stdout.write(
+            f"{label:<22} rows={len(df):>9,}  peak={peak / 2**20:9.1f} MB  "
+            f"frame={frame_size / 2**20:8.1f} MB  time={elapsed:6.2f}s"
+        )
+        return peak
+
+    def handle(self, *args, **options):
+        fields = options['fields']
+        queryset = TradingData.objects.filter(
+            holding_weeks__in=options['weeks'],
+            cooldown_setting=options['cooldown']
+        ).exclude(mcap_category='Micro')
+
+        self.stdout.write(f"Benchmarking {len(fields)} fields for weeks={options['weeks']} cooldown={options['cooldown']}")
+
+        dict_peak = self.measure("values() + DataFrame", lambda: pd.DataFrame(list(queryset.values(*fields))))
+        loader_peak = self.measure("load_frame", lambda: load_frame(queryset, fields))
+
+        if loader_peak:
+            self.stdout.write(self.style.SUCCESS(f"Peak memory reduced {dict_peak / loader_peak:.1f}x"))
@@ -0,0 +1,92 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+HEAVY_MODULES = ['pandas', 'numpy']
+
+# Imports the entry point and resolves the URLconf, i.e. what a worker does
+# before it can serve its first request
+BOOT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Measures import time and RSS for wsgi.py, asgi.py and manage.py check in fresh interpreters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Runs per target, the median is reported')
+        parser.add_argument('--max-seconds', type=float, default=2.0, help='Fail if any target boots slower')
+        parser.add_argument('--max-rss-mb', type=float, default=150.0, help='Fail if any target peaks above this RSS')
+        parser.add_argument('--allow-heavy', action='store_true', help=f"Don't fail when {HEAVY_MODULES} load at boot")
+
+    def run_once(self, args):
+        """Runs a fresh interpreter, returning (wall seconds, peak RSS MB, probe output)"""
+        with tempfile.TemporaryFile('w+') as out, tempfile.TemporaryFile('w+') as err:
+            started = time.perf_counter()
+            proc = subprocess.Popen(args, cwd=settings.BASE_DIR, env=os.environ.copy(), stdout=out, stderr=err, text=True)
+            # wait4 reports the peak RSS of this child alone (kilobytes on Linux)
+            _, status, usage = os.wait4(proc.pid, 0)
+            elapsed = time.perf_counter() - started
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            out.seek(0)
+            err.seek(0)
+            stdout, stderr = out.read(), err.read()
+
+        if proc.returncode != 0:
+            raise CommandError(f"{' '.join(args)} failed:\n{stderr}")
+        rss_mb = usage.ru_maxrss / 1024
+        return elapsed, rss_mb, stdout
+
+    def handle(self, *args, **options):
+        python = sys.executable
+        targets = [
+            ("wsgi.py", [python, '-c', BOOT_PROBE.format(module='backend.wsgi', heavy=HEAVY_MODULES)]),
+            ("asgi.py", [python, '-c', BOOT_PROBE.format(module='backend.asgi', heavy=HEAVY_MODULES)]),
+            ("manage.py check", [python, 'manage.py', 'check']),
+        ]
+
+        failures = []
+        for label, command in targets:
+            seconds, rss, heavy = [], [], set()
+            for _ in range(options['runs']):
+                elapsed, rss_mb, stdout = self.run_once(command)
+                probe = json.loads(stdout.strip().splitlines()[-1]) if label != "manage.py check" else {}
+                # Boot probes time the imports themselves; check is timed end to end
+                seconds.append(probe.get("seconds", elapsed))
+                rss.append(rss_mb)
+                heavy.update(probe.get("heavy", []))
+
+            median_seconds = statistics.median(seconds)
+            median_rss = statistics.median(rss)
+            if label == "manage.py check":
+                heavy_text = "n/a"
+            else:
+                heavy_text = ", ".join(sorted(heavy)) or "none"
+            self.stdout.write(f"{label:<16} time={median_seconds:6.3f}s  rss={median_rss:7.1f} MB  heavy imports: {heavy_text}")
+
+            if median_seconds > options['max_seconds']:
+                failures.append(f"{label} took {median_seconds:.3f}s (limit {options['max_seconds']}s)")
+            if median_rss > options['max_rss_mb']:
+                failures.append(f"{label} used {median_rss:.1f} MB (limit {options['max_rss_mb']} MB)")
+            if heavy and not options['allow_heavy']:
+                failures.append(f"{label} imported {heavy_text} at boot")
+
+        if failures:
+            raise CommandError("Startup budget exceeded:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Startup within budget"))
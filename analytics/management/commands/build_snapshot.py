@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from analytics.caching import get_dataset_version
+from analytics.snapshot import get_snapshot, write_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Writes the memory-mapped TradingData snapshot shared by all workers'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Writing snapshot for dataset version {get_dataset_version()}...")
+        path = write_snapshot()
+        if path is None:
+            self.stdout.write(self.style.ERROR("ANALYTICS_SNAPSHOT_DIR is not configured"))
+            return
+
+        snapshot = get_snapshot()
+        rows = snapshot.rows if snapshot else 0
+        self.stdout.write(self.style.SUCCESS(f"Snapshot written to {path} ({rows:,} rows)"))
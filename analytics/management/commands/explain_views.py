@@ -0,0 +1,167 @@
+import json
+import random
+import re
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Max, Min
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from analytics.models import TradingData
+from analytics.urls import urlpatterns
+
+# Audit the database path: no cached responses, no shared snapshot
+AUDIT_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    'ANALYTICS_SNAPSHOT_DIR': None,
+}
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# Server-side cursors (load_frame) are logged as DECLARE ... FOR <select>
+_DECLARE = re.compile(r'^\s*DECLARE\s+\S+\s+.*?CURSOR\s+(?:WITH(?:OUT)?\s+HOLD\s+)?FOR\s+', re.I | re.S)
+
+
+def statement_sql(sql):
+    """Returns the plain statement, unwrapping server-side cursor declarations"""
+    return _DECLARE.sub("", sql, count=1)
+
+
+def normalize_sql(sql):
+    """Replaces literals so the same statement with different params compares equal"""
+    return " ".join(_LITERALS.sub("?", sql).split())
+
+
+def walk_plan(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+class Command(BaseCommand):
+    help = 'Runs every analytics view with sampled params, EXPLAINs each SQL statement and ranks them by time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=2, help='Number of (weeks, cooldown) pairs to sample')
+        parser.add_argument('--views', nargs='*', help='Only audit these URL names (default: all)')
+        parser.add_argument('--top', type=int, default=10, help='Statements to detail in the report')
+        parser.add_argument('--n-plus-one', type=int, default=3, help='Flag statements repeated this often in one request')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def sample_params(self, samples, seed):
+        """Builds parameter combinations from values that actually exist in the table"""
+        pairs = sorted(TradingData.objects.values_list('holding_weeks', 'cooldown_setting').distinct())
+        if not pairs:
+            return []
+        pairs = random.Random(seed).sample(pairs, min(samples, len(pairs)))
+
+        combos = []
+        for weeks, cooldown in pairs:
+            queryset = TradingData.objects.filter(holding_weeks=weeks, cooldown_setting=cooldown)
+            dates = queryset.aggregate(start=Min('breakout_date'), end=Max('breakout_date'))
+            top = queryset.values('sector', 'mcap_category').annotate(n=Count('id')).order_by('-n').first()
+
+            base = {'weeks': weeks, 'cooldown_weeks': cooldown}
+            combos.append(base)
+            combos.append({
+                **base,
+                'start_date': dates['start'].strftime('%Y-%m-%d'),
+                'end_date': dates['end'].strftime('%Y-%m-%d'),
+                'sector': top['sector'],
+                'mcap': top['mcap_category'],
+            })
+        return combos
+
+    def explain(self, sql):
+        """Returns (EXPLAIN ANALYZE output, flags) for a SELECT, or (None, []) otherwise"""
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None, []
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+            raw = cursor.fetchone()[0]
+        result = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+
+        flags = []
+        for node in walk_plan(result["Plan"]):
+            if "Seq Scan" in node["Node Type"]:
+                rows = node.get("Actual Rows", 0) * node.get("Actual Loops", 1)
+                flags.append(f"seq scan on {node.get('Relation Name')} ({rows:,} rows)")
+            if node.get("Sort Space Type") == "Disk":
+                flags.append(f"sort spilled {node.get('Sort Space Used')} kB to disk")
+        return result, flags
+
+    def handle(self, *args, **options):
+        can_explain = connection.vendor == 'postgresql'
+        if not can_explain:
+            self.stdout.write(self.style.WARNING(
+                f"EXPLAIN (ANALYZE, BUFFERS) needs PostgreSQL, {connection.vendor} only gets query counts"
+            ))
+
+        combos = self.sample_params(options['samples'], options['seed'])
+        if not combos:
+            self.stdout.write(self.style.ERROR("No data in DB!"))
+            return
+
+        patterns = [p for p in urlpatterns if not options['views'] or p.name in options['views']]
+        factory = RequestFactory()
+        requests, statements = [], []
+
+        with override_settings(**AUDIT_SETTINGS):
+            for pattern in patterns:
+                path = f"/api/{pattern.pattern}"
+                for params in combos:
+                    label = f"{pattern.name} {params}"
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = pattern.callback(factory.get(path, params))
+                        wall = time.perf_counter() - started
+                    queries = [statement_sql(q['sql']) for q in captured.captured_queries]
+
+                    repeats = Counter(normalize_sql(sql) for sql in queries)
+                    flags = [
+                        f"N+1: statement ran {n}x: {sql[:100]}"
+                        for sql, n in repeats.items() if n >= options['n_plus_one']
+                    ]
+
+                    db_time = 0.0
+                    for sql in queries:
+                        if not can_explain:
+                            continue
+                        plan, plan_flags = self.explain(sql)
+                        if plan is None:
+                            continue
+                        ms = plan["Execution Time"] + plan.get("Planning Time", 0)
+                        db_time += ms
+                        buffers = plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Shared Read Blocks", 0)
+                        statements.append({
+                            "view": pattern.name, "ms": ms, "buffers": buffers,
+                            "flags": plan_flags, "sql": " ".join(sql.split()),
+                        })
+                        flags.extend(f for f in plan_flags if f not in flags)
+
+                    requests.append({
+                        "label": label, "status": response.status_code, "wall_ms": wall * 1000,
+                        "db_ms": db_time, "queries": len(queries), "flags": flags,
+                    })
+
+        self.stdout.write("\nRequests ranked by total time")
+        self.stdout.write("-" * 80)
+        for rank, req in enumerate(sorted(requests, key=lambda r: r["wall_ms"], reverse=True), 1):
+            self.stdout.write(
+                f"{rank:>3}. {req['label']}\n"
+                f"     status={req['status']} queries={req['queries']} "
+                f"total={req['wall_ms']:.1f}ms explained_db={req['db_ms']:.1f}ms"
+            )
+            for flag in req["flags"]:
+                self.stdout.write(self.style.WARNING(f"     ! {flag}"))
+
+        if statements:
+            self.stdout.write(f"\nTop {options['top']} statements by execution time")
+            self.stdout.write("-" * 80)
+            for stmt in sorted(statements, key=lambda s: s["ms"], reverse=True)[:options['top']]:
+                self.stdout.write(f"{stmt['ms']:9.1f}ms  buffers={stmt['buffers']:<8} [{stmt['view']}] {stmt['sql'][:160]}")
+                for flag in stmt["flags"]:
+                    self.stdout.write(self.style.WARNING(f"           ! {flag}"))
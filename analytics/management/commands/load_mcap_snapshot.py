@@ -0,0 +1,56 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.mcap import MAX_DELETE_RATIO, McapRefreshError, refresh_mcap
+
+
+class Command(BaseCommand):
+    help = 'Stores a market-cap snapshot and reclassifies, drops (Micro) or quarantines (missing symbols) only the affected TradingData rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NSE market-cap CSV, e.g. data/MCAP-NSE-0711.csv')
+        parser.add_argument('--as-of', required=True, help='Date the snapshot is effective from (YYYY-MM-DD)')
+        parser.add_argument(
+            '--as-of-dates', action='store_true',
+            help="Only reclassify breakouts inside this snapshot's effective window instead of all rows"
+        )
+        parser.add_argument(
+            '--max-delete-ratio', type=float, default=MAX_DELETE_RATIO,
+            help=f'Refuse the snapshot if it would drop or quarantine more than this share of rows (default {MAX_DELETE_RATIO})'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            as_of = date.fromisoformat(options['as_of'])
+        except ValueError:
+            raise CommandError(f"Invalid --as-of date: {options['as_of']}")
+
+        started = time.perf_counter()
+        try:
+            snapshot, changed = refresh_mcap(
+                options['path'], as_of, as_of_dates=options['as_of_dates'],
+                max_delete_ratio=options['max_delete_ratio']
+            )
+        except McapRefreshError as e:
+            raise CommandError(f"{e}. Nothing was changed.")
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Stored {snapshot} with {snapshot.classifications.count():,} symbols")
+        if not changed:
+            self.stdout.write(self.style.SUCCESS(f"No rows changed category ({elapsed:.1f}s)"))
+            return
+
+        totals = {}
+        for (weeks, cooldown), counts in sorted(changed.items()):
+            self.stdout.write(
+                f"  {weeks}w / {cooldown}c: {counts['reclassified']:,} reclassified, "
+                f"{counts['dropped_micro']:,} dropped as Micro, {counts['quarantined']:,} quarantined"
+            )
+            for name, count in counts.items():
+                totals[name] = totals.get(name, 0) + count
+        self.stdout.write(self.style.SUCCESS(
+            f"Reclassified {totals['reclassified']:,}, dropped {totals['dropped_micro']:,} and quarantined "
+            f"{totals['quarantined']:,} rows in {len(changed)} slices ({elapsed:.1f}s)"
+        ))
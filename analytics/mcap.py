@@ -0,0 +1,217 @@
+from django.db import connection, transaction
+
+from .caching import invalidate_slices
+from .lazy import np, pd
+from .models import McapClassification, McapSnapshot
+
+# Rank cut-offs (by market cap, descending) for each category
+MCAP_RANKS = [(50, "Mega"), (100, "Large"), (250, "Mid"), (500, "Small")]
+
+# A snapshot that would delete (drop as Micro or quarantine) more of the
+# rows it applies to than this is refused, e.g. a truncated CSV
+MAX_DELETE_RATIO = 0.05
+
+
+class McapRefreshError(Exception):
+    """Raised when a snapshot can't be applied to TradingData"""
+
+
+def read_mcap_file(path):
+    """Reads an NSE market-cap CSV and ranks every symbol into a category"""
+    mcap_df = pd.read_csv(path)
+    mcap_df["Market Capitalisation"] = pd.to_numeric(
+        mcap_df["Market Capitalisation"].astype(str).str.replace(",", "", regex=True),
+        errors="coerce"
+    )
+    mcap_df = mcap_df.sort_values(by="Market Capitalisation", ascending=False).reset_index(drop=True)
+
+    rank = mcap_df.index.to_numpy()
+    mcap_df["mcap_category"] = np.select(
+        [rank < limit for limit, _ in MCAP_RANKS],
+        [label for _, label in MCAP_RANKS],
+        default="Micro"
+    )
+    return mcap_df.rename(columns={"NSE Symbol": "symbol", "Market Capitalisation": "market_cap"})[
+        ["symbol", "market_cap", "mcap_category"]
+    ]
+
+
+def latest_mcap_map():
+    """symbol -> category from the newest stored snapshot, or None if none is stored"""
+    snapshot = McapSnapshot.objects.first()
+    if snapshot is None:
+        return None
+    return dict(snapshot.classifications.values_list('symbol', 'mcap_category'))
+
+
+@transaction.atomic
+def store_mcap_snapshot(mcap_df, as_of, source_file):
+    """Saves (or replaces) the snapshot for `as_of` with its classifications"""
+    McapSnapshot.objects.filter(as_of=as_of).delete()
+    snapshot = McapSnapshot.objects.create(as_of=as_of, source_file=source_file)
+
+    mcap_df = mcap_df.drop_duplicates("symbol")
+    McapClassification.objects.bulk_create(
+        [
+            McapClassification(
+                snapshot=snapshot,
+                symbol=row.symbol,
+                market_cap=None if pd.isna(row.market_cap) else float(row.market_cap),
+                mcap_category=row.mcap_category,
+            )
+            for row in mcap_df.itertuples(index=False)
+        ],
+        batch_size=5000
+    )
+    return snapshot
+
+
+# Ingest skips microcaps, so rows whose symbol is now Micro are removed
+DROP_MICRO_SQL = """
+    WITH removed AS (
+        DELETE FROM analytics_tradingdata AS t
+        USING analytics_mcapclassification AS c
+        WHERE c.snapshot_id = %(snapshot_id)s
+          AND t.symbol = c.symbol
+          AND c.mcap_category = 'Micro'
+          {date_window}
+        RETURNING t.holding_weeks, t.cooldown_setting
+    )
+    SELECT holding_weeks, cooldown_setting, COUNT(*)
+    FROM removed
+    GROUP BY holding_weeks, cooldown_setting
+"""
+
+# Ingest quarantines symbols missing from the mcap data; do the same here
+# instead of keeping their old category
+QUARANTINE_UNKNOWN_SQL = """
+    WITH removed AS (
+        DELETE FROM analytics_tradingdata AS t
+        WHERE NOT EXISTS (
+            SELECT 1 FROM analytics_mcapclassification AS c
+            WHERE c.snapshot_id = %(snapshot_id)s AND c.symbol = t.symbol
+        )
+          {date_window}
+        RETURNING t.*
+    ), quarantined AS (
+        INSERT INTO analytics_quarantinedrow (source_file, row_number, holding_weeks, reasons, raw, created_at)
+        SELECT %(source)s, removed.id, removed.holding_weeks, 'unknown_symbol',
+               (SELECT jsonb_object_agg(key, value #>> '{{}}') FROM jsonb_each(to_jsonb(removed))),
+               NOW()
+        FROM removed
+    )
+    SELECT holding_weeks, cooldown_setting, COUNT(*)
+    FROM removed
+    GROUP BY holding_weeks, cooldown_setting
+"""
+
+# Only rows whose category actually differs are written; RETURNING feeds
+# the per-slice cache invalidation
+RECLASSIFY_SQL = """
+    WITH updated AS (
+        UPDATE analytics_tradingdata AS t
+        SET mcap_category = c.mcap_category
+        FROM analytics_mcapclassification AS c
+        WHERE c.snapshot_id = %(snapshot_id)s
+          AND t.symbol = c.symbol
+          AND t.mcap_category <> c.mcap_category
+          {date_window}
+        RETURNING t.holding_weeks, t.cooldown_setting
+    )
+    SELECT holding_weeks, cooldown_setting, COUNT(*)
+    FROM updated
+    GROUP BY holding_weeks, cooldown_setting
+"""
+
+# What the two DELETE steps would remove, checked before either of them runs
+DELETE_COUNT_SQL = """
+    SELECT COUNT(*),
+           COUNT(*) FILTER (WHERE c.mcap_category = 'Micro'),
+           COUNT(*) FILTER (WHERE c.symbol IS NULL)
+    FROM analytics_tradingdata AS t
+    LEFT JOIN analytics_mcapclassification AS c
+      ON c.snapshot_id = %(snapshot_id)s AND c.symbol = t.symbol
+    WHERE TRUE
+      {date_window}
+"""
+
+RECLASSIFY_STEPS = [
+    ("dropped_micro", DROP_MICRO_SQL),
+    ("quarantined", QUARANTINE_UNKNOWN_SQL),
+    ("reclassified", RECLASSIFY_SQL),
+]
+
+
+def reclassify(snapshot, as_of_dates=False, max_delete_ratio=MAX_DELETE_RATIO):
+    """
+    Brings TradingData in line with `snapshot` using set-based statements
+    joined on symbol, leaving the rows a full ingest would have produced:
+    rows of symbols that are now Micro are deleted, rows of symbols missing
+    from the snapshot move to the quarantine table (unknown_symbol), and the
+    rest get the new category. With `as_of_dates`, only rows whose
+    breakout_date falls in this snapshot's effective window
+    [as_of, next snapshot's as_of) are touched, so each breakout keeps the
+    classification of its own time.
+
+    Returns {(holding_weeks, cooldown_setting): {"dropped_micro": n,
+    "quarantined": n, "reclassified": n}} for every slice that changed.
+    Symbols rising into the top 500 only appear after the next full ingest,
+    since their rows were never loaded.
+
+    Raises McapRefreshError, before anything is changed, when `snapshot`
+    isn't the newest one and `as_of_dates` is off (ingest classifies with
+    the newest snapshot), or when more than `max_delete_ratio` of the rows
+    in scope would be deleted.
+    """
+    if not as_of_dates and McapSnapshot.objects.filter(as_of__gt=snapshot.as_of).exists():
+        raise McapRefreshError(
+            f"{snapshot} is older than the newest stored snapshot; "
+            f"apply it with as_of_dates (--as-of-dates) to limit it to its own date window"
+        )
+
+    params = {"snapshot_id": snapshot.id, "source": f"mcap snapshot {snapshot.as_of}"}
+    date_window = ""
+    if as_of_dates:
+        date_window = "AND t.breakout_date >= %(start)s"
+        params["start"] = snapshot.as_of
+        following = McapSnapshot.objects.filter(as_of__gt=snapshot.as_of).order_by('as_of').first()
+        if following is not None:
+            date_window += " AND t.breakout_date < %(end)s"
+            params["end"] = following.as_of
+
+    changed = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(DELETE_COUNT_SQL.format(date_window=date_window), params)
+        total, micro, unknown = cursor.fetchone()
+        if micro + unknown > max_delete_ratio * total:
+            raise McapRefreshError(
+                f"{snapshot} would delete {micro:,} Micro and quarantine {unknown:,} of {total:,} rows "
+                f"(limit {max_delete_ratio:.0%}), the file may be incomplete"
+            )
+
+        for label, sql in RECLASSIFY_STEPS:
+            cursor.execute(sql.format(date_window=date_window), params)
+            for weeks, cooldown, count in cursor.fetchall():
+                counts = changed.setdefault((weeks, cooldown), {name: 0 for name, _ in RECLASSIFY_STEPS})
+                counts[label] = count
+
+    return changed
+
+
+def refresh_mcap(path, as_of, as_of_dates=False, max_delete_ratio=MAX_DELETE_RATIO):
+    """
+    Stores a new snapshot, reclassifies (or drops) changed rows, rewrites the
+    shared snapshot and invalidates only the cache slices that changed. If
+    reclassify() refuses the snapshot, it isn't stored either.
+    """
+    from .snapshot import write_snapshot
+
+    mcap_df = read_mcap_file(path)
+    with transaction.atomic():
+        snapshot = store_mcap_snapshot(mcap_df, as_of, str(path))
+        changed = reclassify(snapshot, as_of_dates=as_of_dates, max_delete_ratio=max_delete_ratio)
+
+    if changed:
+        write_snapshot()
+        invalidate_slices(changed.keys())
+    return snapshot, changed
@@ -0,0 +1,75 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:03
+
+from django.db import migrations, models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Round
+
+
+def populate_derived_columns(apps, schema_editor):
+    """Backfills the derived columns for rows loaded before they existed"""
+    TradingData = apps.get_model('analytics', 'TradingData')
+
+    # NaN returns become NULL so queries no longer need to exclude them
+    TradingData.objects.filter(return_percentage=float('nan')).update(return_percentage=None)
+
+    edges = [20, 40, 60, 80, 100]
+    labels = ["20-40%", "40-60%", "60-80%", "80-100%"]
+    bucket = Case(
+        *[
+            When(return_percentage__gte=low, return_percentage__lt=high, then=Value(label))
+            for low, high, label in zip(edges, edges[1:], labels)
+        ],
+        When(return_percentage__gte=edges[-1], then=Value(">100%")),
+        default=None,
+        output_field=models.CharField(),
+    )
+
+    TradingData.objects.update(
+        duration_rounded=Round(F('duration')),
+        return_bucket=bucket,
+        is_success=Case(When(Q(return_percentage__gt=0), then=Value(True)), default=Value(False)),
+        is_big_win=Case(When(Q(return_percentage__gte=20), then=Value(True)), default=Value(False)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tradingdata',
+            name='return_percentage',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tradingdata',
+            name='duration_rounded',
+            field=models.IntegerField(db_index=True, default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tradingdata',
+            name='is_big_win',
+            field=models.BooleanField(db_index=True, default=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tradingdata',
+            name='is_success',
+            field=models.BooleanField(db_index=True, default=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tradingdata',
+            name='return_bucket',
+            field=models.CharField(blank=True, db_index=True, max_length=10, null=True),
+        ),
+        migrations.RunPython(populate_derived_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tradingdata',
+            index=models.Index(fields=['holding_weeks', 'cooldown_setting', 'duration_rounded', 'return_bucket'], name='analytics_t_holding_af4288_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_tradingdata_derived_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='McapSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField(unique=True)),
+                ('source_file', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-as_of'],
+            },
+        ),
+        migrations.CreateModel(
+            name='McapClassification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=50)),
+                ('market_cap', models.FloatField(null=True)),
+                ('mcap_category', models.CharField(max_length=20)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='classifications', to='analytics.mcapsnapshot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['symbol', 'snapshot'], name='analytics_m_symbol_ad6db7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'symbol'), name='unique_symbol_per_mcap_snapshot')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:16
+
+from django.db import migrations, models
+
+
+def quarantine_null_returns(apps, schema_editor):
+    """Moves rows stored with a NULL (formerly NaN) return into the quarantine table"""
+    TradingData = apps.get_model('analytics', 'TradingData')
+    QuarantinedRow = apps.get_model('analytics', 'QuarantinedRow')
+
+    rows = TradingData.objects.filter(return_percentage__isnull=True)
+    QuarantinedRow.objects.bulk_create(
+        [
+            QuarantinedRow(
+                source_file='TradingData',
+                row_number=row['id'],
+                holding_weeks=row['holding_weeks'],
+                reasons='invalid_return',
+                raw={k: None if v is None else str(v) for k, v in row.items()},
+            )
+            for row in rows.values()
+        ],
+        batch_size=5000
+    )
+    rows.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_mcap_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuarantinedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_file', models.CharField(max_length=255)),
+                ('row_number', models.IntegerField()),
+                ('holding_weeks', models.IntegerField()),
+                ('reasons', models.CharField(max_length=200)),
+                ('raw', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source_file', 'row_number'], name='analytics_q_source__b99a33_idx')],
+            },
+        ),
+        migrations.RunPython(quarantine_null_returns, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tradingdata',
+            name='return_percentage',
+            field=models.FloatField(),
+        ),
+    ]
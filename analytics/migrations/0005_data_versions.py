@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:28
+
+from django.core.cache import cache
+from django.db import migrations, models
+
+
+def copy_cached_versions(apps, schema_editor):
+    """Persists the versions currently in the cache so snapshots and cache keys stay valid"""
+    TradingData = apps.get_model('analytics', 'TradingData')
+    DataVersion = apps.get_model('analytics', 'DataVersion')
+
+    names = ["dataset_version", "slice_generation"] + [
+        f"slice_version_{weeks}_{cooldown}"
+        for weeks, cooldown in TradingData.objects.values_list('holding_weeks', 'cooldown_setting').distinct()
+    ]
+    stored = cache.get_many(names)
+    DataVersion.objects.bulk_create(
+        [DataVersion(name=name, value=str(value)) for name, value in stored.items() if value]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_quarantine'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.CharField(max_length=50)),
+            ],
+        ),
+        migrations.RunPython(copy_cached_versions, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,16 @@
 from django.db import models
 
+# Return buckets used by the chart endpoint, lower edge inclusive (20 <= r < 40 ...)
+RETURN_BUCKET_EDGES = [20, 40, 60, 80, 100]
+RETURN_BUCKET_LABELS = ["20-40%", "40-60%", "60-80%", "80-100%", ">100%"]
+
+
+def return_bucket_labels(edges):
+    """Labels for bins between consecutive edges plus an open-ended last bin"""
+    labels = [f"{low:g}-{high:g}%" for low, high in zip(edges, edges[1:])]
+    return labels + [f">{edges[-1]:g}%"]
+
+
 class TradingData(models.Model):
     # Core identifying info
     symbol = models.CharField(max_length=50, db_index=True)
@@ -14,13 +25,81 @@ class TradingData(models.Model):
     # Date and Metrics
     breakout_date = models.DateField(db_index=True)
     duration = models.FloatField()
-    return_percentage = models.FloatField()  # This is the 12-Month %
+    return_percentage = models.FloatField()  # This is the 12-Month % (NaN/inf rows are quarantined at ingest)
+
+    # Derived at ingest time (see analytics/derived.py) so requests don't recompute them
+    duration_rounded = models.IntegerField(db_index=True)
+    return_bucket = models.CharField(max_length=10, null=True, blank=True, db_index=True)  # None below 20%
+    is_success = models.BooleanField(db_index=True)  # return > 0
+    is_big_win = models.BooleanField(db_index=True)  # return >= 20
 
     class Meta:
         # This makes sure the database can handle queries on these combined filters very fast
         indexes = [
             models.Index(fields=['holding_weeks', 'cooldown_setting']),
+            models.Index(fields=['holding_weeks', 'cooldown_setting', 'duration_rounded', 'return_bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.symbol} ({self.holding_weeks}w / {self.cooldown_setting}c)"
+
+class McapSnapshot(models.Model):
+    """One market-cap ranking file (e.g. MCAP-NSE-0711.csv), effective from `as_of`"""
+    as_of = models.DateField(unique=True)
+    source_file = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-as_of']
+
+    def __str__(self):
+        return f"MCAP snapshot {self.as_of} ({self.source_file})"
+
+
+class McapClassification(models.Model):
+    """Category of one symbol in one snapshot"""
+    snapshot = models.ForeignKey(McapSnapshot, on_delete=models.CASCADE, related_name='classifications')
+    symbol = models.CharField(max_length=50)
+    market_cap = models.FloatField(null=True)
+    mcap_category = models.CharField(max_length=20)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['snapshot', 'symbol'], name='unique_symbol_per_mcap_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['symbol', 'snapshot']),
+        ]
+
+    def __str__(self):
+        return f"{self.symbol}: {self.mcap_category}"
+
+
+class DataVersion(models.Model):
+    """
+    Durable copy of the version tokens in analytics/caching.py (dataset, per
+    slice). The cache culls entries, so it only fronts this table.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.CharField(max_length=50)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class QuarantinedRow(models.Model):
+    """A source row rejected by ingest validation (see analytics/validation.py)"""
+    source_file = models.CharField(max_length=255)
+    row_number = models.IntegerField()  # Line in the source file, header is line 1
+    holding_weeks = models.IntegerField()
+    reasons = models.CharField(max_length=200)  # Comma-separated reason codes
+    raw = models.JSONField()  # Original values as text
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['source_file', 'row_number']),
         ]
 
     def __str__(self):
-        return f"{self.symbol} ({self.holding_weeks}w / {self.cooldown_setting}c)"
\ No newline at end of file
+        return f"{self.source_file}:{self.row_number} ({self.reasons})"
@@ -0,0 +1,193 @@
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from .caching import get_dataset_version
+from .lazy import np, pd
+from .loader import load_frame
+from .models import TradingData
+
+# Columns kept in the snapshot, enough for every in-memory view computation
+SNAPSHOT_FIELDS = [
+    'symbol', 'company', 'sector', 'mcap_category',
+    'holding_weeks', 'cooldown_setting', 'breakout_date',
+    'duration', 'return_percentage', 'duration_rounded',
+    'return_bucket', 'is_success', 'is_big_win',
+]
+
+POINTER_FILE = "CURRENT"
+KEEP_SNAPSHOTS = 2
+
+_current = None
+_current_stamp = None
+_lock = threading.Lock()
+
+
+def snapshot_dir():
+    directory = getattr(settings, 'ANALYTICS_SNAPSHOT_DIR', None)
+    return Path(directory) if directory else None
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped columns of TradingData. Every worker maps the same
+    files, so the OS page cache holds a single copy however many workers run.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "manifest.json") as f:
+            manifest = json.load(f)
+
+        self.version = manifest["version"]
+        self.rows = manifest["rows"]
+        self.dictionaries = {
+            field: np.array(labels, dtype=object)
+            for field, labels in manifest["dictionaries"].items()
+        }
+        self.columns = {
+            field: np.load(self.path / f"{field}.npy", mmap_mode='r')
+            for field in manifest["fields"]
+        }
+
+    def _mask(self, field, value):
+        column = self.columns[field]
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+
+        if field in self.dictionaries:
+            # Compare integer codes rather than strings
+            labels = self.dictionaries[field]
+            codes = np.searchsorted(labels, values)
+            codes = [c for c, v in zip(codes, values) if c < len(labels) and labels[c] == v]
+            return np.isin(column, codes)
+        return np.isin(column, list(values))
+
+    def frame(self, fields, filters=None, exclude=None):
+        """
+        Returns a DataFrame for rows matching `filters` and not matching `exclude`.
+        Only exact and `__in` lookups are supported, e.g. {'holding_weeks__in': [26, 52]}.
+        """
+        mask = np.ones(self.rows, dtype=bool)
+        for lookups, negate in ((filters or {}, False), (exclude or {}, True)):
+            for key, value in lookups.items():
+                field, _, lookup = key.partition("__")
+                if lookup not in ("", "in"):
+                    raise ValueError(f"Unsupported snapshot lookup: {key}")
+                matched = self._mask(field, value)
+                mask &= ~matched if negate else matched
+
+        data = {}
+        for field in fields:
+            selected = np.asarray(self.columns[field][mask])
+            if field in self.dictionaries:
+                data[field] = pd.Categorical.from_codes(
+                    selected, categories=self.dictionaries[field]
+                ).remove_unused_categories()
+            else:
+                data[field] = selected
+        return pd.DataFrame(data)
+
+
+def write_snapshot(version=None):
+    """
+    Dumps TradingData into a new snapshot directory and atomically points
+    CURRENT at it. Older snapshots beyond KEEP_SNAPSHOTS are removed; workers
+    still mapping them keep their pages until they remap.
+    """
+    root = snapshot_dir()
+    if root is None:
+        return None
+
+    version = version or get_dataset_version()
+    root.mkdir(parents=True, exist_ok=True)
+    # Unique per write, so an in-place rewrite (e.g. mcap refresh) still remaps workers
+    final = root / f"v-{version}-{time.time_ns()}"
+    tmp = root / f".tmp-{version}-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+
+    df = load_frame(TradingData.objects.order_by(), SNAPSHOT_FIELDS)
+
+    dictionaries = {}
+    for field in SNAPSHOT_FIELDS:
+        column = df[field]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            dictionaries[field] = column.cat.categories.tolist()
+            np.save(tmp / f"{field}.npy", column.cat.codes.to_numpy(dtype=np.int32))
+        else:
+            np.save(tmp / f"{field}.npy", column.to_numpy())
+
+    with open(tmp / "manifest.json", "w") as f:
+        json.dump({
+            "version": version,
+            "rows": len(df),
+            "fields": SNAPSHOT_FIELDS,
+            "dictionaries": dictionaries,
+        }, f)
+
+    os.rename(tmp, final)
+
+    pointer_tmp = root / f"{POINTER_FILE}.{os.getpid()}"
+    pointer_tmp.write_text(final.name)
+    os.replace(pointer_tmp, root / POINTER_FILE)
+
+    snapshots = sorted(root.glob("v-*"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in snapshots[KEEP_SNAPSHOTS:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+    return final
+
+
+def get_snapshot():
+    """
+    Returns the mapped snapshot, remapping when CURRENT has been swapped.
+    Returns None when there is no snapshot or it lags behind the dataset version.
+    """
+    global _current, _current_stamp
+
+    root = snapshot_dir()
+    if root is None:
+        return None
+
+    pointer = root / POINTER_FILE
+    try:
+        stamp = pointer.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if stamp != _current_stamp:
+        with _lock:
+            if stamp != _current_stamp:
+                try:
+                    name = pointer.read_text().strip()
+                    if _current is None or _current.path.name != name:
+                        _current = Snapshot(root / name)
+                    _current_stamp = stamp
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"Snapshot unavailable: {str(e)}")
+                    return None
+
+    snapshot = _current
+    if snapshot is None or snapshot.version != get_dataset_version():
+        return None
+    return snapshot
+
+
+def trading_frame(fields, filters, exclude=None):
+    """
+    Loads TradingData columns for the views: from the shared snapshot when it
+    is current, otherwise straight from the database.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return snapshot.frame(fields, filters, exclude)
+
+    queryset = TradingData.objects.filter(**filters)
+    if exclude:
+        queryset = queryset.exclude(**exclude)
+    return load_frame(queryset, fields)
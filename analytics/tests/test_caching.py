@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .. import caching
+from ..caching import get_or_refresh, mark_stale
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class QueuedPool:
+    """Stands in for the refresh pool; jobs run when the test says so"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, function, *args):
+        self.jobs.append((function, args))
+
+    def run(self):
+        jobs, self.jobs = self.jobs, []
+        for function, args in jobs:
+            function(*args)
+
+
+@override_settings(CACHES=LOCMEM)
+class GetOrRefreshTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.version = "v1"
+        self.pool = QueuedPool()
+        for name, replacement in (
+            ('get_dataset_version', lambda: self.version),
+            ('_get_refresh_pool', lambda: self.pool),
+        ):
+            patcher = mock.patch.object(caching, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Pending jobs hold refresh slots; always give them back
+        self.addCleanup(self.pool.run)
+
+    def compute(self, *values):
+        return mock.Mock(side_effect=list(values))
+
+    def test_miss_computes_in_request_and_fresh_hit_does_not(self):
+        compute = self.compute("a")
+        self.assertEqual(get_or_refresh("k", compute, 600), "a")
+        self.assertEqual(get_or_refresh("k", compute, 600), "a")
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(self.pool.jobs, [])
+
+    def test_expired_entry_is_served_while_it_refreshes(self):
+        compute = self.compute("a", "b")
+        get_or_refresh("k", compute, 0)
+        self.assertEqual(get_or_refresh("k", compute, 600), "a")
+        self.assertEqual(compute.call_count, 1)
+        self.pool.run()
+        self.assertEqual(get_or_refresh("k", compute, 600), "b")
+
+    def test_new_dataset_version_makes_entry_stale(self):
+        compute = self.compute("a", "b")
+        get_or_refresh("k", compute, 600)
+        self.version = "v2"
+        self.assertEqual(get_or_refresh("k", compute, 600), "a")
+        self.pool.run()
+        self.assertEqual(get_or_refresh("k", compute, 600), "b")
+        self.assertEqual(self.pool.jobs, [])
+
+    def test_one_refresh_per_key(self):
+        compute = self.compute("a", "b")
+        get_or_refresh("k", compute, 0)
+        get_or_refresh("k", compute, 0)
+        get_or_refresh("k", compute, 0)
+        self.assertEqual(len(self.pool.jobs), 1)
+        self.pool.run()
+        self.assertIsNone(cache.get("k:refreshing"))
+
+    def test_refresh_keeps_version_read_before_compute(self):
+        def compute():
+            # An ingest finishing while the refresh runs
+            self.version = "v3"
+            return "b"
+
+        get_or_refresh("k", self.compute("a"), 0)
+        get_or_refresh("k", compute, 600)
+        self.pool.run()
+        self.assertEqual(cache.get("k")[2], "v1")
+        # So the next request refreshes again for v3
+        self.assertEqual(get_or_refresh("k", self.compute("c"), 600), "b")
+        self.assertEqual(len(self.pool.jobs), 1)
+
+    def test_failed_refresh_keeps_old_value(self):
+        get_or_refresh("k", self.compute("a"), 0)
+        with mock.patch('builtins.print'):
+            get_or_refresh("k", self.compute(RuntimeError("db down")), 600)
+            self.pool.run()
+        self.assertEqual(get_or_refresh("k", self.compute("b"), 600), "a")
+        self.assertEqual(len(self.pool.jobs), 1)
+
+    def test_mark_stale_keeps_value_and_triggers_refresh(self):
+        get_or_refresh("k", self.compute("a"), 600)
+        cache.set("plain", "x")
+        mark_stale(["k", "plain", "missing"])
+        self.assertIsNone(cache.get("plain"))
+        self.assertEqual(get_or_refresh("k", self.compute("b"), 600), "a")
+        self.pool.run()
+        self.assertEqual(get_or_refresh("k", self.compute(), 600), "b")
@@ -0,0 +1,63 @@
+import math
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from .. import confidence
+from ..confidence import success_rate_intervals
+
+
+class SuccessRateIntervalTests(SimpleTestCase):
+    def intervals(self, successes, totals, method, level=0.95):
+        low, high = success_rate_intervals(successes, totals, method, level)
+        return list(zip(low.tolist(), high.tolist()))
+
+    def test_wilson_values(self):
+        self.assertEqual(self.intervals([1, 0, 50], [1, 3, 100], "wilson"), [
+            (20.7, 100.0), (0.0, 56.2), (40.4, 59.6)
+        ])
+
+    def test_bootstrap_falls_back_to_wilson_for_degenerate_groups(self):
+        # Too few samples, no successes, no failures
+        successes, totals = [5, 0, 40], [10, 40, 40]
+        self.assertEqual(
+            self.intervals(successes, totals, "bootstrap"),
+            self.intervals(successes, totals, "wilson")
+        )
+
+    def test_bootstrap_interval_has_spread(self):
+        (low, high), = self.intervals([300], [1000], "bootstrap")
+        self.assertLess(low, 30.0)
+        self.assertGreater(high, 30.0)
+        # Close to the analytic interval for a large group
+        (w_low, w_high), = self.intervals([300], [1000], "wilson")
+        self.assertAlmostEqual(low, w_low, delta=1.0)
+        self.assertAlmostEqual(high, w_high, delta=1.0)
+
+    def test_bootstrap_is_reproducible(self):
+        successes, totals = [120, 300, 45], [400, 1000, 60]
+        self.assertEqual(
+            self.intervals(successes, totals, "bootstrap"),
+            self.intervals(successes, totals, "bootstrap")
+        )
+
+    def test_bootstrap_batches_cover_every_group(self):
+        successes = np.arange(40, 140)
+        totals = np.full(100, 200)
+        with mock.patch.object(confidence, 'MAX_BATCH_CELLS', 3000):
+            low, high = success_rate_intervals(successes, totals, "bootstrap")
+        self.assertFalse(np.isnan(low).any() or np.isnan(high).any())
+        self.assertTrue((low < successes / totals * 100).all())
+        self.assertTrue((high > successes / totals * 100).all())
+
+    def test_empty_groups_are_nan(self):
+        for method in ("wilson", "bootstrap"):
+            (low, high), = self.intervals([0], [0], method)
+            self.assertTrue(math.isnan(low) and math.isnan(high), msg=method)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            success_rate_intervals([1], [2], "exact")
+        with self.assertRaises(ValueError):
+            success_rate_intervals([1], [2], "wilson", 0.5)
@@ -0,0 +1,37 @@
+import math
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ..derived import add_derived_columns
+
+
+class AddDerivedColumnsTests(SimpleTestCase):
+    def derive(self, returns, durations=None):
+        df = pd.DataFrame({
+            'duration': durations if durations is not None else [1.0] * len(returns),
+            'return_percentage': returns,
+        })
+        return add_derived_columns(df)
+
+    def test_bucket_edges_are_lower_inclusive(self):
+        df = self.derive([19.99, 20, 39.99, 40, 60, 80, 99.99, 100, 500])
+        self.assertEqual(df['return_bucket'].tolist(), [
+            None, '20-40%', '20-40%', '40-60%', '60-80%', '80-100%', '80-100%', '>100%', '>100%'
+        ])
+
+    def test_missing_buckets_are_none_not_nan(self):
+        df = self.derive([-5, 10, np.nan])
+        self.assertEqual(df['return_bucket'].dtype, object)
+        self.assertEqual(df['return_bucket'].tolist(), [None, None, None])
+
+    def test_success_flags(self):
+        df = self.derive([-1, 0, 0.01, 19.99, 20, np.nan, np.inf])
+        self.assertEqual(df['is_success'].tolist(), [False, False, True, True, True, False, False])
+        self.assertEqual(df['is_big_win'].tolist(), [False, False, False, False, True, False, False])
+        self.assertTrue(math.isnan(df['return_percentage'].iloc[-1]))
+
+    def test_duration_rounded(self):
+        df = self.derive([1, 1, 1], durations=[0.4, 0.6, 12.49])
+        self.assertEqual(df['duration_rounded'].tolist(), [0, 1, 12])
@@ -0,0 +1,49 @@
+import time
+
+from django.test import SimpleTestCase
+
+from ..filters import parse_float_list, parse_int_list
+
+
+class ParseIntListTests(SimpleTestCase):
+    def test_values_and_ranges(self):
+        self.assertEqual(parse_int_list("52, 20,26,52"), [20, 26, 52])
+        self.assertEqual(parse_int_list("20-24"), [20, 21, 22, 23, 24])
+        self.assertEqual(parse_int_list("20-32:4,26"), [20, 24, 26, 28, 32])
+
+    def test_default(self):
+        self.assertEqual(parse_int_list("", default=[52]), [52])
+        self.assertEqual(parse_int_list(None, default=range(1, 4)), [1, 2, 3])
+
+    def test_limit(self):
+        self.assertEqual(parse_int_list("1-3", limit=3), [1, 2, 3])
+        with self.assertRaises(ValueError):
+            parse_int_list("1-4", limit=3)
+        with self.assertRaises(ValueError):
+            parse_int_list("1,2,3,4", limit=3)
+
+    def test_huge_span_fails_before_expanding(self):
+        started = time.perf_counter()
+        with self.assertRaises(ValueError):
+            parse_int_list("0-2000000000", limit=600)
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_malformed(self):
+        for value in ("abc", "20-", "20-40:0", "20-40:-2"):
+            with self.assertRaises(ValueError, msg=value):
+                parse_int_list(value)
+
+
+class ParseFloatListTests(SimpleTestCase):
+    def test_keeps_order(self):
+        self.assertEqual(parse_float_list("40, 20,62.5"), [40.0, 20.0, 62.5])
+        self.assertEqual(parse_float_list("", default=[1, 2]), [1, 2])
+
+    def test_rejects_non_finite_and_malformed(self):
+        for value in ("1,nan", "inf", "1,x"):
+            with self.assertRaises(ValueError, msg=value):
+                parse_float_list(value)
+
+    def test_limit(self):
+        with self.assertRaises(ValueError):
+            parse_float_list("1,2,3", limit=2)
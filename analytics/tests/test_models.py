@@ -0,0 +1,13 @@
+from django.test import SimpleTestCase
+
+from ..models import RETURN_BUCKET_EDGES, RETURN_BUCKET_LABELS, return_bucket_labels
+
+
+class ReturnBucketLabelsTests(SimpleTestCase):
+    def test_default_edges_match_stored_labels(self):
+        self.assertEqual(return_bucket_labels(RETURN_BUCKET_EDGES), RETURN_BUCKET_LABELS)
+        self.assertEqual(return_bucket_labels([float(e) for e in RETURN_BUCKET_EDGES]), RETURN_BUCKET_LABELS)
+
+    def test_custom_edges(self):
+        self.assertEqual(return_bucket_labels([-10, 0, 12.5]), ['-10-0%', '0-12.5%', '>12.5%'])
+        self.assertEqual(return_bucket_labels([50]), ['>50%'])
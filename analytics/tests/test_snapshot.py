@@ -0,0 +1,79 @@
+import datetime
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..caching import bump_dataset_version
+from ..models import TradingData
+from ..snapshot import Snapshot, get_snapshot, trading_frame, write_snapshot
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+ROWS = [
+    # symbol, sector, mcap, weeks, cooldown, return
+    ('AAA', 'Tech', 'Large', 52, 20, 25.0),
+    ('BBB', 'Bank', 'Mid', 52, 52, -5.0),
+    ('CCC', 'Tech', 'Small', 26, 52, 110.0),
+    ('DDD', 'Pharma', 'Micro', 52, 52, 45.0),
+]
+
+
+@override_settings(CACHES=LOCMEM)
+class SnapshotTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_override = override_settings(ANALYTICS_SNAPSHOT_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+
+        TradingData.objects.bulk_create([
+            TradingData(
+                symbol=symbol, company=f"{symbol} Ltd", sector=sector, mcap_category=mcap,
+                holding_weeks=weeks, cooldown_setting=cooldown,
+                breakout_date=datetime.date(2020, 1, i + 1), duration=i + 0.5,
+                return_percentage=ret, duration_rounded=i, is_success=ret > 0, is_big_win=ret >= 20,
+            )
+            for i, (symbol, sector, mcap, weeks, cooldown, ret) in enumerate(ROWS)
+        ])
+        self.snapshot = Snapshot(write_snapshot())
+
+    def symbols(self, filters=None, exclude=None):
+        df = self.snapshot.frame(['symbol'], filters, exclude)
+        return sorted(df['symbol'].astype(str))
+
+    def test_exact_and_in_lookups(self):
+        self.assertEqual(self.symbols({'holding_weeks': 52}), ['AAA', 'BBB', 'DDD'])
+        self.assertEqual(self.symbols({'sector__in': ['Tech', 'Bank']}), ['AAA', 'BBB', 'CCC'])
+        self.assertEqual(self.symbols({'holding_weeks': 52, 'cooldown_setting': 52}), ['BBB', 'DDD'])
+
+    def test_exclude(self):
+        self.assertEqual(self.symbols({'holding_weeks': 52}, exclude={'mcap_category': 'Micro'}), ['AAA', 'BBB'])
+
+    def test_unknown_label_matches_nothing(self):
+        self.assertEqual(self.symbols({'sector': 'Energy'}), [])
+        self.assertEqual(self.symbols(exclude={'sector': 'Energy'}), ['AAA', 'BBB', 'CCC', 'DDD'])
+
+    def test_unsupported_lookup(self):
+        with self.assertRaises(ValueError):
+            self.snapshot.frame(['symbol'], {'return_percentage__gte': 20})
+
+    def test_columns_match_the_database(self):
+        fields = ['symbol', 'sector', 'return_percentage', 'return_bucket', 'is_big_win']
+        df = self.snapshot.frame(fields, {'holding_weeks__in': [26, 52]}).sort_values('symbol')
+        self.assertEqual(df['sector'].astype(str).tolist(), ['Tech', 'Bank', 'Tech', 'Pharma'])
+        self.assertEqual(df['return_percentage'].tolist(), [25.0, -5.0, 110.0, 45.0])
+        self.assertEqual(df['is_big_win'].tolist(), [True, False, True, True])
+        # Categories only keep the labels present in the selection
+        self.assertEqual(list(self.snapshot.frame(['sector'], {'sector': 'Bank'})['sector'].cat.categories), ['Bank'])
+
+    def test_stale_snapshot_is_not_used(self):
+        self.assertIsNotNone(get_snapshot())
+        bump_dataset_version()
+        self.assertIsNone(get_snapshot())
+        # trading_frame falls back to the database
+        df = trading_frame(['symbol'], {'holding_weeks': 26})
+        self.assertEqual(df['symbol'].astype(str).tolist(), ['CCC'])
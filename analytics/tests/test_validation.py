@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ..validation import IngestValidationError, summarize_reasons, validate_chunk
+
+MCAP_MAP = {'AAA': 'Large', 'BBB': 'Mid', 'CCC': 'Micro'}
+
+
+def chunk(rows, start=0):
+    """Builds a renamed source chunk; `start` offsets the index like a later CSV chunk"""
+    df = pd.DataFrame(rows, columns=['sym', 'date', 'dur', 'ret', 'cool'])
+    df.index += start
+    return df
+
+
+class ValidateChunkTests(SimpleTestCase):
+    def reasons(self, rows, seen_keys=None):
+        _, rejected = validate_chunk(chunk(rows), MCAP_MAP, seen_keys)
+        return rejected['reasons'].tolist()
+
+    def test_valid_rows_are_parsed(self):
+        valid, rejected = validate_chunk(chunk([('AAA', '2020-01-01', '5.5', '12', '52')]), MCAP_MAP)
+        self.assertTrue(rejected.empty)
+        row = valid.iloc[0]
+        self.assertEqual(row['ret'], 12.0)
+        self.assertEqual(row['dur'], 5.5)
+        self.assertEqual(row['cool'], 52)
+        self.assertEqual(str(row['date']), '2020-01-01')
+        self.assertEqual(row['mcap'], 'Large')
+
+    def test_microcaps_pass_validation(self):
+        valid, rejected = validate_chunk(chunk([('CCC', '2020-01-01', 1, 5, 20)]), MCAP_MAP)
+        self.assertTrue(rejected.empty)
+        self.assertEqual(valid['mcap'].tolist(), ['Micro'])
+
+    def test_invalid_returns(self):
+        rows = [('AAA', f'2020-01-0{i + 1}', 1, ret, 20) for i, ret in enumerate([np.nan, np.inf, -np.inf, 'abc'])]
+        self.assertEqual(self.reasons(rows), ['invalid_return'] * 4)
+
+    def test_negative_or_missing_duration(self):
+        rows = [('AAA', '2020-01-01', -1, 5, 20), ('AAA', '2020-01-02', None, 5, 20), ('AAA', '2020-01-03', 0, 5, 20)]
+        self.assertEqual(self.reasons(rows), ['negative_duration', 'negative_duration'])
+
+    def test_invalid_cooldown(self):
+        rows = [('AAA', '2020-01-01', 1, 5, 'x'), ('AAA', '2020-01-02', 1, 5, 20.5)]
+        self.assertEqual(self.reasons(rows), ['invalid_cooldown', 'invalid_cooldown'])
+
+    def test_unparseable_date(self):
+        self.assertEqual(self.reasons([('AAA', 'not a date', 1, 5, 20)]), ['unparseable_date'])
+
+    def test_mixed_date_formats_are_accepted(self):
+        rows = [('AAA', '2020-01-01', 1, 5, 20), ('AAA', '2020-01-03 10:00', 1, 5, 20), ('BBB', pd.Timestamp('2020-02-01'), 1, 5, 20)]
+        valid, rejected = validate_chunk(chunk(rows), MCAP_MAP)
+        self.assertTrue(rejected.empty)
+        self.assertEqual([str(d) for d in valid['date']], ['2020-01-01', '2020-01-03', '2020-02-01'])
+
+    def test_unknown_symbol(self):
+        self.assertEqual(self.reasons([('ZZZ', '2020-01-01', 1, 5, 20)]), ['unknown_symbol'])
+
+    def test_reasons_accumulate(self):
+        self.assertEqual(self.reasons([('ZZZ', 'bad', -1, np.nan, 20)]), [
+            'invalid_return,negative_duration,unparseable_date,unknown_symbol'
+        ])
+
+    def test_duplicate_keys_keep_first(self):
+        rows = [
+            ('AAA', '2020-01-01', 1, 5, 20),
+            ('AAA', '2020-01-01 00:00', 2, 6, 20),  # same day, same cooldown
+            ('AAA', '2020-01-01', 1, 5, 52),        # other cooldown
+            ('BBB', '2020-01-01', 1, 5, 20),        # other symbol
+        ]
+        valid, rejected = validate_chunk(chunk(rows), MCAP_MAP)
+        self.assertEqual(rejected.index.tolist(), [1])
+        self.assertEqual(rejected['reasons'].tolist(), ['duplicate_key'])
+        self.assertEqual(len(valid), 3)
+
+    def test_duplicate_keys_across_chunks(self):
+        seen_keys = set()
+        first, _ = validate_chunk(chunk([('AAA', '2020-01-01', 1, 5, 20), ('AAA', 'bad', 1, 5, 20)]), MCAP_MAP, seen_keys)
+        valid, rejected = validate_chunk(
+            chunk([('AAA', '2020-01-01', 3, 7, 20), ('AAA', '2020-01-02', 1, 5, 20)], start=2), MCAP_MAP, seen_keys
+        )
+        self.assertEqual(len(first), 1)
+        self.assertEqual(rejected.index.tolist(), [2])
+        self.assertEqual(rejected['reasons'].tolist(), ['duplicate_key'])
+        self.assertEqual(len(valid), 1)
+
+    def test_rejected_rows_do_not_claim_keys(self):
+        seen_keys = set()
+        validate_chunk(chunk([('AAA', '2020-01-01', -1, 5, 20)]), MCAP_MAP, seen_keys)
+        valid, rejected = validate_chunk(chunk([('AAA', '2020-01-01', 1, 5, 20)], start=1), MCAP_MAP, seen_keys)
+        self.assertTrue(rejected.empty)
+        self.assertEqual(len(valid), 1)
+
+    def test_missing_columns(self):
+        with self.assertRaises(IngestValidationError):
+            validate_chunk(pd.DataFrame({'sym': ['AAA'], 'date': ['2020-01-01']}), MCAP_MAP)
+
+    def test_summarize_reasons(self):
+        _, rejected = validate_chunk(chunk([('ZZZ', 'bad', 1, 5, 20), ('ZZZ', '2020-01-01', 1, 5, 20)]), MCAP_MAP)
+        self.assertEqual(summarize_reasons(rejected), {'unknown_symbol': 2, 'unparseable_date': 1})
+        self.assertEqual(summarize_reasons(rejected.iloc[0:0]), {})
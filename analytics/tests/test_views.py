@@ -0,0 +1,64 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..models import TradingData
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM, ANALYTICS_SNAPSHOT_DIR=None)
+class TimeSeriesViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # No breakouts in February 2020
+        rows = [
+            (datetime.date(2020, 1, 3), 10.0, 2.0),
+            (datetime.date(2020, 1, 20), -4.0, 4.0),
+            (datetime.date(2020, 3, 9), 30.0, 6.0),
+            (datetime.date(2020, 4, 1), -1.0, 10.0),
+        ]
+        TradingData.objects.bulk_create([
+            TradingData(
+                symbol=f"S{i}", sector='Tech', mcap_category='Large', holding_weeks=52, cooldown_setting=52,
+                breakout_date=day, duration=duration, return_percentage=ret,
+                duration_rounded=round(duration), is_success=ret > 0, is_big_win=ret >= 20,
+            )
+            for i, (day, ret, duration) in enumerate(rows)
+        ])
+
+    def series(self, **params):
+        response = self.client.get('/api/timeseries/', dict(weeks=52, cooldown_weeks=52, **params))
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_monthly_values(self):
+        data = self.series()
+        self.assertEqual([p['period'] for p in data], ['2020-01-01', '2020-03-01', '2020-04-01'])
+        self.assertEqual([p['samples'] for p in data], [2, 1, 1])
+        self.assertEqual([p['success_rate'] for p in data], [50.0, 100.0, 0.0])
+        self.assertEqual([p['average_duration'] for p in data], [3.0, 6.0, 10.0])
+        self.assertNotIn('smoothed_success_rate', data[0])
+
+    def test_rolling_window_counts_empty_periods(self):
+        data = self.series(window=2)
+        # March's window is February (empty) and March, not January and March
+        self.assertEqual([p['smoothed_success_rate'] for p in data], [50.0, 100.0, 50.0])
+        self.assertEqual([p['smoothed_average_duration'] for p in data], [3.0, 6.0, 8.0])
+
+    def test_rolling_window_is_sample_weighted(self):
+        data = self.series(window=4)
+        self.assertEqual([p['smoothed_success_rate'] for p in data], [50.0, 66.7, 50.0])
+        self.assertEqual([p['smoothed_average_duration'] for p in data], [3.0, 4.0, 5.5])
+
+    def test_quarters(self):
+        data = self.series(period='quarter', window=2)
+        self.assertEqual([p['period'] for p in data], ['2020-01-01', '2020-04-01'])
+        self.assertEqual([p['samples'] for p in data], [3, 1])
+        self.assertEqual([p['smoothed_success_rate'] for p in data], [66.7, 50.0])
+
+    def test_invalid_parameters(self):
+        for params in ({'window': 0}, {'window': 25}, {'period': 'week'}, {'window': 'x'}):
+            response = self.client.get('/api/timeseries/', params)
+            self.assertEqual(response.status_code, 400, params)
@@ -1,12 +1,17 @@
 from django.urls import path
-from .views import DashboardDataView, SectorListView, KPIDataView, DateRangeView, SectorPerformanceView, ConfidenceTrendView, SectorDurationView
+from .views import DashboardDataView, SectorListView, KPIDataView, DateRangeView, SectorPerformanceView, ConfidenceTrendView, SectorDurationView, SuccessIntervalView, FacetCountView, CooldownSweepView, TimeSeriesView, AdmissionStatsView
 
 urlpatterns = [
     path('chart-data/', DashboardDataView.as_view(), name='chart-data'),
     path('sectors/', SectorListView.as_view(), name='sectors'),
+    path('facets/', FacetCountView.as_view(), name='facets'),
     path('kpi-data/', KPIDataView.as_view(), name='kpi-data'),
+    path('timeseries/', TimeSeriesView.as_view(), name='timeseries'),
+    path('cooldown-sweep/', CooldownSweepView.as_view(), name='cooldown-sweep'),
     path('date-range/', DateRangeView.as_view(), name='date-range'),
     path('sector-performance/', SectorPerformanceView.as_view(), name='sector-performance'),
     path('confidence-trend/', ConfidenceTrendView.as_view(), name='confidence-trend'),
     path('sector-duration/', SectorDurationView.as_view(), name='sector-duration'),
+    path('success-intervals/', SuccessIntervalView.as_view(), name='success-intervals'),
+    path('admission-stats/', AdmissionStatsView.as_view(), name='admission-stats'),
 ]
\ No newline at end of file
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+# Columns every source file must provide (after ingest_data.py renames them)
+REQUIRED_COLUMNS = ['sym', 'date', 'dur', 'ret', 'cool']
+
+# Reason codes stored on QuarantinedRow.reasons, in the order they are checked
+REASONS = [
+    'invalid_return',     # missing, non-numeric, NaN or +/-inf
+    'negative_duration',  # negative, missing or non-numeric
+    'invalid_cooldown',   # missing or not a whole number of weeks
+    'unparseable_date',
+    'duplicate_key',      # (symbol, breakout_date, cooldown) already seen in this file
+    'unknown_symbol',     # not in the mcap snapshot
+]
+
+
+class IngestValidationError(Exception):
+    """Raised when a source file can't be ingested at all (e.g. too many bad rows)"""
+
+
+def validate_chunk(df, mcap_map, seen_keys=None):
+    """
+    Checks whole columns of a renamed source chunk at once.
+
+    Returns (valid, rejected): `valid` has the parsed ret/dur/cool/date columns
+    and an `mcap` column, `rejected` keeps the raw values plus a comma-separated
+    `reasons` column. Duplicate keys are checked against `seen_keys` (a set
+    shared across the chunks of one file, updated in place) so the first
+    occurrence wins. Holding weeks are fixed per file, so they aren't part of
+    the key.
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise IngestValidationError(f"missing columns: {', '.join(missing)}")
+
+    ret = pd.to_numeric(df['ret'], errors='coerce').astype(np.float64)
+    dur = pd.to_numeric(df['dur'], errors='coerce').astype(np.float64)
+    cool = pd.to_numeric(df['cool'], errors='coerce').astype(np.float64)
+    # Parse each value on its own, like the old per-row parsing (no format inferred from row 1)
+    dates = pd.to_datetime(df['date'], errors='coerce', format='mixed').dt.normalize()
+    mcap = df['sym'].map(mcap_map)
+
+    keys = pd.MultiIndex.from_arrays([df['sym'], dates, cool])
+    duplicate = keys.duplicated(keep='first')
+    if seen_keys is not None:
+        duplicate |= keys.isin(seen_keys)
+
+    with np.errstate(invalid='ignore'):
+        checks = {
+            'invalid_return': ~np.isfinite(ret),
+            'negative_duration': ~(dur >= 0),
+            'invalid_cooldown': cool.isna() | (cool % 1 != 0),
+            'unparseable_date': dates.isna(),
+            'duplicate_key': pd.Series(duplicate, index=df.index),
+            'unknown_symbol': mcap.isna(),
+        }
+
+    reasons = pd.Series("", index=df.index)
+    for name in REASONS:
+        reasons = reasons.mask(checks[name], reasons + name + ",")
+    bad = reasons != ""
+
+    if seen_keys is not None:
+        seen_keys.update(keys[~bad.to_numpy()])
+
+    valid = df[~bad].assign(
+        ret=ret[~bad], dur=dur[~bad], cool=cool[~bad].astype(int),
+        date=dates[~bad].dt.date, mcap=mcap[~bad]
+    )
+    rejected = df[bad].assign(reasons=reasons[bad].str.rstrip(","))
+    return valid, rejected
+
+
+def summarize_reasons(rejected):
+    """Counts rejected rows per reason (a row can have several)"""
+    if rejected.empty:
+        return {}
+    return rejected['reasons'].str.split(",").explode().value_counts().to_dict()
@@ -1,21 +1,30 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Avg, Max, Count, Q, Sum, Min
-from .models import TradingData
-import pandas as pd
-from django.db import models
+from django.db.models import Avg, Max, Count, Q, Sum, Min, F, Case, When, Value, ExpressionWrapper
+from django.db.models.functions import Round, Trunc
+from .models import TradingData, RETURN_BUCKET_EDGES, RETURN_BUCKET_LABELS, return_bucket_labels
+from django.db import models, connection
 import math
 from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-import numpy as np
+from .caching import versioned_cache_key, get_or_refresh
+from .filters import parse_filters, filter_queryset, parse_int_list, parse_float_list
+from .confidence import success_rate_intervals
+from .snapshot import trading_frame
+from .admission import AdmissionControlMixin, admission_setting, rejection_counts
+# pandas/numpy load on first use; date-range/, sectors/ etc. never need them
+from .lazy import np, pd
 # scipy not available, using manual calculation
 
 
 
-class DateRangeView(APIView):
+class DateRangeView(AdmissionControlMixin, APIView):
     """Returns min and max dates for the specific selected file/cooldown from Database"""
     
+    # Cached for 10 minutes, a slot would only slow down cache hits
+    concurrency_limited = False
+    
     def get(self, request):
         try:
             holding_weeks = int(request.query_params.get("weeks", 52))
@@ -56,9 +65,12 @@ class DateRangeView(APIView):
             print(f"Error in DateRangeView: {str(e)}")
             return Response({"min_date": None, "max_date": None})
 
-class SectorListView(APIView):
+class SectorListView(AdmissionControlMixin, APIView):
     """Returns unique sectors from the database"""
     
+    # Cached for 10 minutes, a slot would only slow down cache hits
+    concurrency_limited = False
+    
     def get(self, request):
         # Cache sector list for 10 minutes (rarely changes)
         cache_key = "sectors_list"
@@ -79,110 +91,291 @@ class SectorListView(APIView):
         
         return Response(sectors)
 
-class DashboardDataView(APIView):
-    """Returns the filtered graph data using Database queries"""
+class DashboardDataView(AdmissionControlMixin, APIView):
+    """
+    Returns the duration x return histogram for the filtered data. Return bin
+    edges (`return_edges`, the last bin is open-ended) and the duration bucket
+    width (`duration_width`, weeks) are optional; the counting happens in the
+    database so only one row per non-empty bin is fetched.
+    """
+    
+    MAX_RETURN_EDGES = 41
+    MIN_DURATION_WIDTH = 0.25
+    MAX_DURATION_WIDTH = 52
+    
+    def cost_queryset(self, request):
+        return filter_queryset(parse_filters(request.query_params))
     
     def get(self, request):
         try:
-            holding_weeks = int(request.query_params.get("weeks", 52))
-            cooldown = int(request.query_params.get("cooldown_weeks", 52))
-            
-            # Base queryset with index optimization
-            queryset = TradingData.objects.filter(
-                holding_weeks=holding_weeks,
-                cooldown_setting=cooldown
+            queryset = filter_queryset(parse_filters(request.query_params))
+            edges = parse_float_list(
+                request.query_params.get("return_edges"), default=RETURN_BUCKET_EDGES, limit=self.MAX_RETURN_EDGES
             )
+            width = float(request.query_params.get("duration_width", 1))
+            if not edges:
+                raise ValueError("return_edges needs at least one value")
+            if any(low >= high for low, high in zip(edges, edges[1:])):
+                raise ValueError("return_edges must be strictly increasing")
+            if not self.MIN_DURATION_WIDTH <= width <= self.MAX_DURATION_WIDTH:
+                raise ValueError(
+                    f"duration_width must be between {self.MIN_DURATION_WIDTH:g} and {self.MAX_DURATION_WIDTH:g}"
+                )
+            
+            if edges == RETURN_BUCKET_EDGES and width == 1:
+                # Default bins are pre-bucketed at ingest, so the histogram is
+                # a single GROUP BY on the stored columns
+                labels = RETURN_BUCKET_LABELS
+                buckets = queryset.filter(
+                    return_bucket__isnull=False
+                ).values(
+                    duration_bucket=F('duration_rounded'), bucket=F('return_bucket')
+                ).annotate(
+                    count=Count('id')
+                ).order_by('duration_bucket')
+            else:
+                # Custom bins: CASE over the edges and rounded duration / width,
+                # both evaluated inside the GROUP BY
+                labels = return_bucket_labels(edges)
+                return_bin = Case(
+                    *[
+                        When(return_percentage__gte=low, return_percentage__lt=high, then=Value(label))
+                        for low, high, label in zip(edges, edges[1:], labels)
+                    ],
+                    When(return_percentage__gte=edges[-1], then=Value(labels[-1])),
+                    output_field=models.CharField(),
+                )
+                duration_bin = ExpressionWrapper(
+                    Round(F('duration') / width) * width, output_field=models.FloatField()
+                )
+                buckets = queryset.filter(
+                    return_percentage__gte=edges[0]
+                ).values(
+                    duration_bucket=duration_bin, bucket=return_bin
+                ).annotate(
+                    count=Count('id')
+                ).order_by('duration_bucket')
 
-            # Apply UI Filters
-            start = request.query_params.get("start_date")
-            end = request.query_params.get("end_date")
-            if start: 
-                queryset = queryset.filter(breakout_date__gte=start)
-            if end: 
-                queryset = queryset.filter(breakout_date__lte=end)
-            
-            sector = request.query_params.get("sector")
-            if sector and sector != "All": 
-                queryset = queryset.filter(sector=sector)
-
-            mcap = request.query_params.get("mcap")
-            if mcap and mcap != "All": 
-                queryset = queryset.filter(mcap_category=mcap)
-
-            # Filter for Success (>= 20%) - use only() to fetch only needed fields
-            success_data = queryset.filter(
-                return_percentage__gte=20
-            ).only('duration', 'return_percentage').values(
-                'duration', 'return_percentage'
-            )
+            chart_data = {}
+            for row in buckets:
+                duration = row['duration_bucket']
+                duration = int(duration) if float(duration).is_integer() else round(duration, 2)
+                entry = chart_data.get(duration)
+                if entry is None:
+                    entry = {"duration": duration}
+                    entry.update({lbl: 0 for lbl in labels})
+                    chart_data[duration] = entry
+                entry[row['bucket']] = row['count']
 
-            if not success_data.exists():
-                return Response([])
+            return Response(list(chart_data.values()))
+            
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            print(f"Error in DashboardDataView: {str(e)}")
+            return Response({"error": str(e)}, status=500)
 
-            # Convert to list immediately to close DB connection
-            success_list = list(success_data)
+class FacetCountView(AdmissionControlMixin, APIView):
+    """
+    Returns row counts per sector, per mcap and per sector x mcap for the
+    current weeks/cooldown/date filter, so the UI can disable empty options.
+    """
+    
+    def cost_queryset(self, request):
+        filters = parse_filters(request.query_params)
+        return filter_queryset(dict(filters, sector=None, mcap=None))
+    
+    def get(self, request):
+        try:
+            filters = parse_filters(request.query_params)
+            # Facets describe the sector/mcap choices, so those filters don't apply
+            filters["sector"] = None
+            filters["mcap"] = None
             
-            df = pd.DataFrame(success_list)
-            df["duration_rounded"] = df["duration"].round().astype(int)
+            cache_key = versioned_cache_key("facets", **filters)
+            cached_result = cache.get(cache_key)
+            if cached_result is not None:
+                return Response(cached_result)
             
-            bins = [20, 40, 60, 80, 100, float("inf")]
-            labels = ["20-40%", "40-60%", "60-80%", "80-100%", ">100%"]
-            df["range"] = pd.cut(df["return_percentage"], bins=bins, labels=labels, right=False)
-
-            chart_data = df.groupby(["duration_rounded", "range"]).size().unstack(fill_value=0)
+            # Reuse the ORM's WHERE clause and compute all facets in one pass
+            base_sql, params = filter_queryset(filters).values(
+                'sector', 'mcap_category'
+            ).query.sql_with_params()
+            
+            sql = f"""
+                SELECT sector, mcap_category, COUNT(*),
+                       GROUPING(sector), GROUPING(mcap_category)
+                FROM ({base_sql}) AS filtered
+                GROUP BY GROUPING SETS ((sector, mcap_category), (sector), (mcap_category), ())
+            """
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+            
+            result = {"total": 0, "sectors": {}, "mcaps": {}, "combinations": {}}
+            for sector, mcap, count, sector_grouped, mcap_grouped in rows:
+                if sector_grouped and mcap_grouped:
+                    result["total"] = count
+                elif mcap_grouped:
+                    result["sectors"][sector] = count
+                elif sector_grouped:
+                    result["mcaps"][mcap] = count
+                else:
+                    result["combinations"].setdefault(sector, {})[mcap] = count
+            
+            result["sectors"] = dict(sorted(result["sectors"].items()))
+            result["combinations"] = dict(sorted(result["combinations"].items()))
             
-            response_data = []
-            for dur, row in chart_data.iterrows():
-                entry = {"duration": int(dur)}
-                for lbl in labels:
-                    entry[lbl] = int(row.get(lbl, 0))
-                response_data.append(entry)
-
-            return Response(sorted(response_data, key=lambda x: x["duration"]))
+            # Cache for 10 minutes
+            cache.set(cache_key, result, 600)
+            
+            return Response(result)
             
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
         except Exception as e:
-            print(f"Error in DashboardDataView: {str(e)}")
+            print(f"Error in FacetCountView: {str(e)}")
             return Response({"error": str(e)}, status=500)
 
-class KPIDataView(APIView):
-    """Returns KPI metrics based on filtered data within the selected date range"""
+class TimeSeriesView(AdmissionControlMixin, APIView):
+    """
+    Returns success rate, sample count and average duration per breakout
+    month/quarter/year for the dashboard filters. Aggregation happens in the
+    database (date_trunc), only the per-period rows come back.
+    """
+    
+    PERIODS = ("month", "quarter", "year")
+    # pandas frequencies matching date_trunc's period starts
+    PERIOD_FREQ = {"month": "MS", "quarter": "QS", "year": "YS"}
+    MAX_WINDOW = 24
+    
+    def cost_queryset(self, request):
+        return filter_queryset(parse_filters(request.query_params))
     
     def get(self, request):
         try:
-            start_date = request.GET.get('start_date')
-            end_date = request.GET.get('end_date')
-            sector = request.GET.get('sector', 'All')
-            mcap = request.GET.get('mcap', 'All')
-            cooldown_weeks = request.GET.get('cooldown_weeks')
-            weeks = request.GET.get('weeks')
-            
-            # Start with all data
-            queryset = TradingData.objects.all()
-            
-            # Apply required filters
-            if cooldown_weeks:
-                queryset = queryset.filter(cooldown_setting=int(cooldown_weeks))
+            filters = parse_filters(request.query_params)
+            period = request.query_params.get("period", "month")
+            window = int(request.query_params.get("window", 1))
+            if period not in self.PERIODS:
+                raise ValueError(f"period must be one of {', '.join(self.PERIODS)}")
+            if not 1 <= window <= self.MAX_WINDOW:
+                raise ValueError(f"window must be between 1 and {self.MAX_WINDOW}")
+            
+            cache_key = versioned_cache_key("timeseries", period=period, window=window, **filters)
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                return Response(cached_data)
             
-            if weeks:
-                queryset = queryset.filter(holding_weeks=int(weeks))
+            rows = list(
+                filter_queryset(filters)
+                .annotate(period=Trunc('breakout_date', period, output_field=models.DateField()))
+                .values('period')
+                .annotate(
+                    samples=Count('id'),
+                    successful=Count('id', filter=Q(is_success=True)),
+                    total_duration=Sum('duration')
+                )
+                .order_by('period')
+            )
             
-            # Apply date range filter
-            if start_date and end_date:
-                queryset = queryset.filter(breakout_date__range=[start_date, end_date])
+            samples = np.array([r['samples'] for r in rows], dtype=np.float64)
+            successful = np.array([r['successful'] for r in rows], dtype=np.float64)
+            total_duration = np.array([r['total_duration'] or 0 for r in rows], dtype=np.float64)
+            
+            # Position of each returned period on the full calendar range, so
+            # periods without breakouts still count towards the window
+            if rows:
+                calendar = pd.date_range(rows[0]['period'], rows[-1]['period'], freq=self.PERIOD_FREQ[period])
+                positions = calendar.get_indexer(pd.to_datetime([r['period'] for r in rows]))
+            else:
+                calendar, positions = [], np.array([], dtype=np.int64)
+            
+            # Sample-weighted rolling sums over the last `window` calendar periods
+            def rolling(values):
+                full = np.zeros(len(calendar))
+                full[positions] = values
+                sums = np.cumsum(full)
+                sums[window:] = sums[window:] - sums[:-window]
+                return sums[positions]
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                success_rate = np.round(successful / samples * 100, 1)
+                avg_duration = np.round(total_duration / samples, 1)
+                smoothed_rate = np.round(rolling(successful) / rolling(samples) * 100, 1)
+                smoothed_duration = np.round(rolling(total_duration) / rolling(samples), 1)
+            
+            result = []
+            for i, row in enumerate(rows):
+                entry = {
+                    "period": row['period'].strftime('%Y-%m-%d'),
+                    "samples": row['samples'],
+                    "success_rate": float(success_rate[i]),
+                    "average_duration": float(avg_duration[i]),
+                }
+                if window > 1:
+                    entry["smoothed_success_rate"] = float(smoothed_rate[i])
+                    entry["smoothed_average_duration"] = float(smoothed_duration[i])
+                result.append(entry)
             
-            # Apply sector filter
-            if sector and sector != 'All':
-                queryset = queryset.filter(sector=sector)
+            # Cache for 10 minutes
+            cache.set(cache_key, result, 600)
+            return Response(result)
             
-            # Apply market cap filter
-            if mcap and mcap != 'All':
-                queryset = queryset.filter(mcap_category=mcap)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            print(f"Error in TimeSeriesView: {str(e)}")
+            return Response({"error": str(e)}, status=500)
+
+class KPIDataView(AdmissionControlMixin, APIView):
+    """Returns KPI metrics based on filtered data within the selected date range"""
+    
+    def filtered_queryset(self, request):
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
+        sector = request.GET.get('sector', 'All')
+        mcap = request.GET.get('mcap', 'All')
+        cooldown_weeks = request.GET.get('cooldown_weeks')
+        weeks = request.GET.get('weeks')
+        
+        # Start with all data
+        queryset = TradingData.objects.all()
+        
+        # Apply required filters
+        if cooldown_weeks:
+            queryset = queryset.filter(cooldown_setting=int(cooldown_weeks))
+        
+        if weeks:
+            queryset = queryset.filter(holding_weeks=int(weeks))
+        
+        # Apply date range filter
+        if start_date and end_date:
+            queryset = queryset.filter(breakout_date__range=[start_date, end_date])
+        
+        # Apply sector filter
+        if sector and sector != 'All':
+            queryset = queryset.filter(sector=sector)
+        
+        # Apply market cap filter
+        if mcap and mcap != 'All':
+            queryset = queryset.filter(mcap_category=mcap)
+        
+        return queryset
+    
+    def cost_queryset(self, request):
+        # Without weeks/cooldown_weeks this is the whole table
+        return self.filtered_queryset(request)
+    
+    def get(self, request):
+        try:
+            queryset = self.filtered_queryset(request)
             
             # Single aggregate query for efficiency
             aggregated = queryset.aggregate(
                 count=Count('id'),
                 total_duration=Sum('duration'),
-                successful=Count('id', filter=Q(return_percentage__gt=0))
+                successful=Count('id', filter=Q(is_success=True))
             )
             
             count = aggregated['count'] or 0
@@ -195,13 +388,8 @@ class KPIDataView(APIView):
                     'success_rate': 0,
                 })
             
-            # Separate query for most profitable (exclude NaN/NULL values)
-            # Filter for valid return_percentage values first
-            most_profitable = queryset.filter(
-                return_percentage__isnull=False
-            ).exclude(
-                return_percentage=float('nan')
-            ).only(
+            # Separate query for most profitable (bad returns are quarantined at ingest)
+            most_profitable = queryset.only(
                 'company', 'symbol', 'return_percentage'
             ).order_by('-return_percentage').first()
             
@@ -210,10 +398,8 @@ class KPIDataView(APIView):
             
             # Calculate most_profitable_return
             most_profitable_return = 0
-            if most_profitable and most_profitable.return_percentage is not None:
-                # Additional safety check for NaN
-                if not math.isnan(most_profitable.return_percentage):
-                    most_profitable_return = round(most_profitable.return_percentage, 2)
+            if most_profitable:
+                most_profitable_return = round(most_profitable.return_percentage, 2)
             
             return Response({
                 'total_samples': count,
@@ -234,6 +420,133 @@ class KPIDataView(APIView):
                 'success_rate': 0,
             }, status=500)
 
+class CooldownSweepView(AdmissionControlMixin, APIView):
+    """
+    Returns KPIs and chart histograms for many cooldown settings (and optionally
+    holding periods) at once, e.g. ?cooldowns=20-104&weeks=26,52.
+    All combinations come from one GROUP BY pass over the stored bucket columns.
+    """
+    
+    MAX_COMBINATIONS = 600
+    max_concurrent = 2
+    
+    def parse_sweep(self, params):
+        """Returns (weeks list, cooldown list, other filters) for a sweep request"""
+        weeks_list = parse_int_list(params.get("weeks"), default=[52], limit=self.MAX_COMBINATIONS)
+        cooldowns = parse_int_list(params.get("cooldowns"), default=range(20, 105), limit=self.MAX_COMBINATIONS)
+        if len(weeks_list) * len(cooldowns) > self.MAX_COMBINATIONS:
+            raise ValueError(f"At most {self.MAX_COMBINATIONS} weeks x cooldown combinations allowed")
+        
+        filters = parse_filters({
+            key: params.get(key) for key in ("start_date", "end_date", "sector", "mcap")
+        })
+        filters["weeks"] = None
+        filters["cooldown_weeks"] = None
+        return weeks_list, cooldowns, filters
+    
+    def sweep_queryset(self, weeks_list, cooldowns, filters):
+        return filter_queryset(filters).filter(
+            holding_weeks__in=weeks_list,
+            cooldown_setting__in=cooldowns
+        )
+    
+    def cost_queryset(self, request):
+        return self.sweep_queryset(*self.parse_sweep(request.query_params))
+    
+    def get(self, request):
+        try:
+            weeks_list, cooldowns, filters = self.parse_sweep(request.query_params)
+            
+            cache_key = versioned_cache_key(
+                "cooldown_sweep", **dict(filters, weeks=weeks_list, cooldown_weeks=cooldowns)
+            )
+            cached_data = cache.get(cache_key)
+            if cached_data is not None:
+                return Response(cached_data)
+            
+            queryset = self.sweep_queryset(weeks_list, cooldowns, filters)
+            
+            # One pass: per (weeks, cooldown, duration, bucket) counts; KPIs are
+            # re-aggregated from the same groups below
+            rows = list(
+                queryset.values('holding_weeks', 'cooldown_setting', 'duration_rounded', 'return_bucket')
+                .annotate(
+                    samples=Count('id'),
+                    total_duration=Sum('duration'),
+                    successful=Count('id', filter=Q(is_success=True)),
+                    max_return=Max('return_percentage')
+                )
+                .order_by()
+            )
+            if not rows:
+                return Response([])
+            
+            df = pd.DataFrame(rows)
+            keys = ['holding_weeks', 'cooldown_setting']
+            
+            kpis = df.groupby(keys).agg(
+                total_samples=('samples', 'sum'),
+                total_duration=('total_duration', 'sum'),
+                successful=('successful', 'sum')
+            )
+            kpis['average_duration'] = (kpis['total_duration'] / kpis['total_samples']).round(1)
+            kpis['success_rate'] = (kpis['successful'] / kpis['total_samples'] * 100).round(1)
+            
+            hist = df[df['return_bucket'].notna()].pivot_table(
+                index=keys + ['duration_rounded'],
+                columns='return_bucket',
+                values='samples',
+                aggfunc='sum',
+                fill_value=0
+            ).reindex(columns=RETURN_BUCKET_LABELS, fill_value=0)
+            
+            # Top return per combination comes from the same pass; only the rows
+            # holding it are fetched for their names (ties keep the lowest id)
+            top_returns = df.groupby(keys)['max_return'].max()
+            matches = Q()
+            for (weeks, cooldown), top in top_returns.items():
+                matches |= Q(holding_weeks=int(weeks), cooldown_setting=int(cooldown), return_percentage=float(top))
+            top_rows = queryset.filter(matches).order_by('id').values(
+                'holding_weeks', 'cooldown_setting', 'company', 'symbol', 'return_percentage'
+            )
+            most_profitable = {}
+            for r in top_rows:
+                most_profitable.setdefault((r['holding_weeks'], r['cooldown_setting']), {
+                    'name': r['company'] or r['symbol'],
+                    'return': round(r['return_percentage'], 2)
+                })
+            
+            charts = {}
+            for (weeks, cooldown, duration), counts in hist.iterrows():
+                entry = {"duration": int(duration)}
+                entry.update({lbl: int(counts[lbl]) for lbl in RETURN_BUCKET_LABELS})
+                charts.setdefault((weeks, cooldown), []).append(entry)
+            
+            result = []
+            for (weeks, cooldown), kpi in kpis.iterrows():
+                key = (int(weeks), int(cooldown))
+                result.append({
+                    "weeks": key[0],
+                    "cooldown_weeks": key[1],
+                    "kpis": {
+                        'total_samples': int(kpi['total_samples']),
+                        'most_profitable': most_profitable.get(key),
+                        'average_duration': float(kpi['average_duration']),
+                        'success_rate': float(kpi['success_rate']),
+                    },
+                    "chart": charts.get(key, [])
+                })
+            
+            # Cache for 10 minutes
+            cache.set(cache_key, result, 600)
+            return Response(result)
+            
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        except Exception as e:
+            print(f"Error in CooldownSweepView: {str(e)}")
+            return Response({"error": str(e)}, status=500)
+
 def calculate_cramers_v(df):
     """
     Calculates Cramer's V statistic for categorical association.
@@ -291,200 +604,309 @@ def calculate_sample_confidence(count, threshold=30):
     return round(math.log(count + 1) / math.log(threshold + 1), 2)
 
 
-class SectorPerformanceView(APIView):
+class SectorPerformanceView(AdmissionControlMixin, APIView):
     """Returns success rate by Sector and Market Cap (Fixed 52w/52c, No Micro)"""
     
+    # Served stale-while-revalidate, recomputed off the request path
+    concurrency_limited = False
+    
+    # Fixed Parameters
+    holding_weeks = 52
+    cooldown = 52
+    
     def get(self, request):
         try:
-            # Fixed Parameters
-            holding_weeks = 52
-            cooldown = 52
-            
-            # Cache key
-            cache_key = f"sector_performance_{holding_weeks}_{cooldown}"
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return Response(cached_data)
+            # Served from cache; refreshed in the background once 10 minutes old
+            cache_key = f"sector_performance_{self.holding_weeks}_{self.cooldown}"
+            return Response(get_or_refresh(cache_key, self.compute, 600))
 
-            # Base Query: Fixed params, Exclude Micro
-            queryset = TradingData.objects.filter(
-                holding_weeks=holding_weeks,
-                cooldown_setting=cooldown
-            ).exclude(mcap_category='Micro')
+        except Exception as e:
+            print(f"Error in SectorPerformanceView: {str(e)}")
+            return Response({"error": str(e)}, status=500)
 
-            # Get necessary fields
-            data_list = list(queryset.values('sector', 'mcap_category', 'return_percentage', 'duration'))
-            
-            if not data_list:
-                return Response({
-                    "data": [],
-                    "overall_confidence": 0,
-                    "relationship_strength": "Very Weak",
-                    "total_samples": 0
-                })
+    @classmethod
+    def compute(cls):
+        # Fixed params, Exclude Micro (from the shared snapshot when available)
+        df = trading_frame(
+            ['sector', 'mcap_category', 'is_success', 'duration'],
+            {'holding_weeks': cls.holding_weeks, 'cooldown_setting': cls.cooldown},
+            exclude={'mcap_category': 'Micro'}
+        )
 
-            df = pd.DataFrame(data_list)
-            
-            # Calculate Overall Confidence (Cramer's V)
-            cv = calculate_cramers_v(df)
-            overall_confidence = round(cv * 100, 1)
-            
-            # Relationship Strength Interpretation
-            if cv > 0.5: strength = "Very Strong"
-            elif cv > 0.3: strength = "Strong"
-            elif cv > 0.15: strength = "Moderate"
-            elif cv > 0.05: strength = "Weak"
-            else: strength = "Very Weak"
-
-            # Group by Sector and Mcap
-            grouped = df.groupby(['sector', 'mcap_category'])
-            
-            # Calculate metrics
-            stats = grouped.agg(
-                total_count=('return_percentage', 'count'),
-                success_count=('return_percentage', lambda x: (x > 0).sum()),
-                avg_duration=('duration', 'mean')
-            ).reset_index()
-            
-            # Calculate percentage and confidence
-            stats['success_rate'] = (stats['success_count'] / stats['total_count'] * 100).round(1)
-            stats['confidence'] = stats['total_count'].apply(calculate_sample_confidence)
-            stats['avg_duration'] = stats['avg_duration'].round(1)
-            
-            # Pivot primarily on Sector
-            pivot_success = stats.pivot(index='sector', columns='mcap_category', values='success_rate').fillna(0)
-            pivot_counts = stats.pivot(index='sector', columns='mcap_category', values='total_count').fillna(0)
-            pivot_conf = stats.pivot(index='sector', columns='mcap_category', values='confidence').fillna(0)
-            pivot_dur = stats.pivot(index='sector', columns='mcap_category', values='avg_duration').fillna(0)
-            
-            # Format for Recharts
-            response_data = []
-            for sector, row in pivot_success.iterrows():
-                entry = {
-                    "sector": sector,
-                    "sample_counts": {},
-                    "confidence_scores": {},
-                    "avg_durations": {}
-                }
-                # Add each cap value, count, and confidence
-                for mcap in row.index:
-                    entry[mcap] = row[mcap]
-                    entry["sample_counts"][mcap] = int(pivot_counts.loc[sector, mcap])
-                    entry["confidence_scores"][mcap] = float(pivot_conf.loc[sector, mcap])
-                    entry["avg_durations"][mcap] = float(pivot_dur.loc[sector, mcap])
-                response_data.append(entry)
-            
-            # Sort alpha by sector
-            response_data.sort(key=lambda x: x['sector'])
-            
-            final_response = {
-                "data": response_data,
-                "overall_confidence": overall_confidence,
-                "relationship_strength": strength,
-                "total_samples": len(df)
+        if df.empty:
+            return {
+                "data": [],
+                "overall_confidence": 0,
+                "relationship_strength": "Very Weak",
+                "total_samples": 0
             }
-            
-            # Cache for 10 minutes
-            cache.set(cache_key, final_response, 600)
-            
-            return Response(final_response)
 
-        except Exception as e:
-            print(f"Error in SectorPerformanceView: {str(e)}")
-            return Response({"error": str(e)}, status=500)
+        # Calculate Overall Confidence (Cramer's V)
+        cv = calculate_cramers_v(df)
+        overall_confidence = round(cv * 100, 1)
+
+        # Relationship Strength Interpretation
+        if cv > 0.5: strength = "Very Strong"
+        elif cv > 0.3: strength = "Strong"
+        elif cv > 0.15: strength = "Moderate"
+        elif cv > 0.05: strength = "Weak"
+        else: strength = "Very Weak"
+
+        # Group by Sector and Mcap
+        grouped = df.groupby(['sector', 'mcap_category'], observed=True)
+
+        # Calculate metrics
+        stats = grouped.agg(
+            total_count=('is_success', 'size'),
+            success_count=('is_success', 'sum'),
+            avg_duration=('duration', 'mean')
+        ).reset_index()
 
-class ConfidenceTrendView(APIView):
+        # Calculate percentage and confidence
+        stats['success_rate'] = (stats['success_count'] / stats['total_count'] * 100).round(1)
+        stats['confidence'] = stats['total_count'].apply(calculate_sample_confidence)
+        stats['avg_duration'] = stats['avg_duration'].astype(float).round(1)
+        stats['ci_low'], stats['ci_high'] = success_rate_intervals(
+            stats['success_count'], stats['total_count']
+        )
+
+        # Pivot primarily on Sector
+        pivot_success = stats.pivot(index='sector', columns='mcap_category', values='success_rate').fillna(0)
+        pivot_counts = stats.pivot(index='sector', columns='mcap_category', values='total_count').fillna(0)
+        pivot_conf = stats.pivot(index='sector', columns='mcap_category', values='confidence').fillna(0)
+        pivot_dur = stats.pivot(index='sector', columns='mcap_category', values='avg_duration').fillna(0)
+        pivot_low = stats.pivot(index='sector', columns='mcap_category', values='ci_low')
+        pivot_high = stats.pivot(index='sector', columns='mcap_category', values='ci_high')
+
+        # Format for Recharts
+        response_data = []
+        for sector, row in pivot_success.iterrows():
+            entry = {
+                "sector": sector,
+                "sample_counts": {},
+                "confidence_scores": {},
+                "avg_durations": {},
+                "success_intervals": {}
+            }
+            # Add each cap value, count, and confidence
+            for mcap in row.index:
+                entry[mcap] = row[mcap]
+                entry["sample_counts"][mcap] = int(pivot_counts.loc[sector, mcap])
+                entry["confidence_scores"][mcap] = float(pivot_conf.loc[sector, mcap])
+                entry["avg_durations"][mcap] = float(pivot_dur.loc[sector, mcap])
+                low, high = pivot_low.loc[sector, mcap], pivot_high.loc[sector, mcap]
+                entry["success_intervals"][mcap] = None if pd.isna(low) else [float(low), float(high)]
+            response_data.append(entry)
+
+        # Sort alpha by sector
+        response_data.sort(key=lambda x: x['sector'])
+
+        final_response = {
+            "data": response_data,
+            "overall_confidence": overall_confidence,
+            "relationship_strength": strength,
+            "total_samples": len(df)
+        }
+
+        return final_response
+
+
+class ConfidenceTrendView(AdmissionControlMixin, APIView):
     """Returns overall confidence and success rate across different durations"""
+    
+    # Served stale-while-revalidate, recomputed off the request path
+    concurrency_limited = False
+    
+    durations = [26, 52, 78, 104, 156, 208]
+    cooldown = 52 # Fixed default
+    
     def get(self, request):
         try:
-            durations = [26, 52, 78, 104, 156, 208]
-            cooldown = 52 # Fixed default
-            
-            # Cache check
-            cache_key = f"confidence_trend_{cooldown}"
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return Response(cached_data)
-                
-            trend_data = []
-            
-            for d in durations:
-                queryset = TradingData.objects.filter(
-                    holding_weeks=d,
-                    cooldown_setting=cooldown
-                ).exclude(mcap_category='Micro')
-                
-                data_list = list(queryset.values('sector', 'mcap_category', 'return_percentage'))
-                if not data_list:
-                    continue
-                    
-                df = pd.DataFrame(data_list)
-                cv = calculate_cramers_v(df)
-                
-                # Calculate average success rate
-                avg_success = (df['return_percentage'] > 0).mean() * 100
-                
-                trend_data.append({
-                    "duration": d,
-                    "confidence": round(cv * 100, 1),
-                    "success_rate": round(avg_success, 1),
-                    "sample_size": len(df)
-                })
-                
-            cache.set(cache_key, trend_data, 600)
-            return Response(trend_data)
+            cache_key = f"confidence_trend_{self.cooldown}"
+            return Response(get_or_refresh(cache_key, self.compute, 600))
             
         except Exception as e:
             print(f"Error in ConfidenceTrendView: {str(e)}")
             return Response({"error": str(e)}, status=500)
 
+    @classmethod
+    def compute(cls):
+        trend_data = []
+
+        for d in cls.durations:
+            df = trading_frame(
+                ['sector', 'mcap_category', 'is_success'],
+                {'holding_weeks': d, 'cooldown_setting': cls.cooldown},
+                exclude={'mcap_category': 'Micro'}
+            )
+            if df.empty:
+                continue
+
+            cv = calculate_cramers_v(df)
+
+            # Calculate average success rate
+            avg_success = df['is_success'].mean() * 100
+
+            trend_data.append({
+                "duration": d,
+                "confidence": round(cv * 100, 1),
+                "success_rate": round(avg_success, 1),
+                "sample_size": len(df)
+            })
+
+        return trend_data
 
-class SectorDurationView(APIView):
+
+class SectorDurationView(AdmissionControlMixin, APIView):
     """Returns sector performance broken down by duration for bubble chart"""
+    
+    # Served stale-while-revalidate, recomputed off the request path
+    concurrency_limited = False
+    
+    durations = [26, 52, 78, 104, 156, 208]
+    cooldown = 52  # Fixed default
+    
     def get(self, request):
         try:
-            durations = [26, 52, 78, 104, 156, 208]
-            cooldown = 52  # Fixed default
+            cache_key = f"sector_duration_bubbles_{self.cooldown}"
+            return Response(get_or_refresh(cache_key, self.compute, 600))
             
-            # Cache check
-            cache_key = f"sector_duration_bubbles_{cooldown}"
+        except Exception as e:
+            print(f"Error in SectorDurationView: {str(e)}")
+            return Response({"error": str(e)}, status=500)
+
+    @classmethod
+    def compute(cls):
+        # Fetch all relevant data at once to minimize queries
+        df = trading_frame(
+            ['sector', 'holding_weeks', 'is_success'],
+            {'holding_weeks__in': cls.durations, 'cooldown_setting': cls.cooldown},
+            exclude={'mcap_category': 'Micro'}
+        )
+
+        if df.empty:
+            return []
+
+        # Group by Sector and Duration
+        stats = df.groupby(['sector', 'holding_weeks'], observed=True).agg(
+            sample_size=('is_success', 'size'),
+            success_count=('is_success', 'sum')
+        ).reset_index()
+
+        # Intervals for every bubble in one batched computation
+        ci_low, ci_high = success_rate_intervals(stats['success_count'], stats['sample_size'])
+
+        bubble_data = []
+
+        for row, low, high in zip(stats.itertuples(index=False), ci_low, ci_high):
+            success_rate = row.success_count / row.sample_size * 100
+
+            bubble_data.append({
+                "sector": row.sector,
+                "duration": int(row.holding_weeks),
+                "success_rate": round(success_rate, 1),
+                "sample_size": int(row.sample_size),
+                "ci_low": float(low),
+                "ci_high": float(high)
+            })
+
+        return bubble_data
+
+
+class SuccessIntervalView(AdmissionControlMixin, APIView):
+    """
+    Returns success rate confidence intervals for every (cooldown, sector, mcap)
+    group of a holding period. Counts are aggregated in the database and all
+    groups are resampled together, so thousands of groups fit in one request.
+    """
+    def filtered_queryset(self, request):
+        holding_weeks = int(request.query_params.get("weeks", 52))
+        cooldown = request.query_params.get("cooldown_weeks")
+        
+        queryset = TradingData.objects.filter(
+            holding_weeks=holding_weeks
+        ).exclude(mcap_category='Micro')
+        if cooldown:
+            queryset = queryset.filter(cooldown_setting=int(cooldown))
+        return queryset
+    
+    def cost_queryset(self, request):
+        # Without cooldown_weeks every cooldown of the holding period is aggregated
+        return self.filtered_queryset(request)
+    
+    def get(self, request):
+        try:
+            holding_weeks = int(request.query_params.get("weeks", 52))
+            cooldown = request.query_params.get("cooldown_weeks")
+            method = request.query_params.get("method", "bootstrap")
+            confidence = float(request.query_params.get("confidence", 0.95))
+            
+            cache_key = versioned_cache_key(
+                "success_intervals",
+                weeks=holding_weeks,
+                cooldown_weeks=int(cooldown) if cooldown else None,
+                method=method,
+                confidence=confidence,
+            )
             cached_data = cache.get(cache_key)
-            if cached_data:
+            if cached_data is not None:
                 return Response(cached_data)
             
-            # Fetch all relevant data at once to minimize queries
-            queryset = TradingData.objects.filter(
-                holding_weeks__in=durations,
-                cooldown_setting=cooldown
-            ).exclude(mcap_category='Micro')
+            queryset = self.filtered_queryset(request)
             
-            data_list = list(queryset.values('sector', 'holding_weeks', 'return_percentage'))
+            groups = list(
+                queryset.values('cooldown_setting', 'sector', 'mcap_category')
+                .annotate(
+                    samples=Count('id'),
+                    successful=Count('id', filter=Q(is_success=True))
+                )
+                .order_by('cooldown_setting', 'sector', 'mcap_category')
+            )
             
-            if not data_list:
-                return Response([])
-                
-            df = pd.DataFrame(data_list)
-            
-            # Group by Sector and Duration
-            grouped = df.groupby(['sector', 'holding_weeks'])
-            
-            bubble_data = []
-            
-            for (sector, duration), group in grouped:
-                success_rate = (group['return_percentage'] > 0).mean() * 100
-                sample_size = len(group)
-                
-                bubble_data.append({
-                    "sector": sector,
-                    "duration": duration,
-                    "success_rate": round(success_rate, 1),
-                    "sample_size": sample_size
-                })
+            totals = np.array([g['samples'] for g in groups], dtype=np.int64)
+            successes = np.array([g['successful'] for g in groups], dtype=np.int64)
+            ci_low, ci_high = success_rate_intervals(successes, totals, method, confidence)
+            
+            result = [
+                {
+                    "cooldown": g['cooldown_setting'],
+                    "sector": g['sector'],
+                    "mcap": g['mcap_category'],
+                    "sample_size": g['samples'],
+                    "success_rate": round(g['successful'] / g['samples'] * 100, 1),
+                    "ci_low": float(low),
+                    "ci_high": float(high),
+                }
+                for g, low, high in zip(groups, ci_low, ci_high)
+            ]
             
-            # Cache for 10 minutes
-            cache.set(cache_key, bubble_data, 600)
-            return Response(bubble_data)
+            # Keyed by dataset version, so it only needs recomputing after an ingest
+            cache.set(cache_key, result, 3600)
+            return Response(result)
             
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
         except Exception as e:
-            print(f"Error in SectorDurationView: {str(e)}")
+            print(f"Error in SuccessIntervalView: {str(e)}")
+            return Response({"error": str(e)}, status=500)
+
+
+class AdmissionStatsView(APIView):
+    """Returns the admission limits and how many requests each endpoint rejected"""
+    
+    def get(self, request):
+        try:
+            from .urls import urlpatterns
+            
+            endpoints = [p.name for p in urlpatterns if p.name != 'admission-stats']
+            return Response({
+                "limits": {
+                    name.lower(): admission_setting(name)
+                    for name in ("MAX_CONCURRENT", "MAX_HEAVY", "HEAVY_ROWS", "STATEMENT_TIMEOUT_MS", "RETRY_AFTER")
+                },
+                "rejections": rejection_counts(endpoints),
+            })
+            
+        except Exception as e:
+            print(f"Error in AdmissionStatsView: {str(e)}")
             return Response({"error": str(e)}, status=500)
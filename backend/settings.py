@@ -180,5 +180,18 @@ CACHES = {
     }
 }
 
+# Memory-mapped TradingData snapshot shared by all workers (written by ingest_data.py)
+ANALYTICS_SNAPSHOT_DIR = os.path.join(BASE_DIR, 'snapshots')
+
+# Admission control for the analytics API (see analytics/admission.py).
+# Slots are PostgreSQL advisory locks, shared by all worker processes.
+ANALYTICS_ADMISSION = {
+    'MAX_CONCURRENT': 4,             # Requests per endpoint at once
+    'HEAVY_ROWS': 250_000,           # Estimated scanned rows that make a request heavy
+    'MAX_HEAVY': 1,                  # Heavy requests at once, across endpoints
+    'STATEMENT_TIMEOUT_MS': 10_000,  # PostgreSQL statement_timeout per request
+    'RETRY_AFTER': 2,                # Seconds, sent with 429/503 responses
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
@@ -16,6 +16,7 @@ const StaggeredChart = ({ onNavigate }) => {
   // --- STATE MANAGEMENT ---
   const [data, setData] = useState([]);
   const [sectors, setSectors] = useState([]);
+  const [facets, setFacets] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [chartHeight, setChartHeight] = useState(600);
@@ -85,7 +86,26 @@ const StaggeredChart = ({ onNavigate }) => {
       .catch(err => console.error("Error fetching date range:", err));
   }, [filters.cooldownWeeks, filters.weeks]);
 
-  // 3. Fetch Chart and KPI Data
+  // 3. Fetch sector/mcap counts so empty combinations can be disabled up front
+  useEffect(() => {
+    if (!filters.startDate || !filters.endDate || !filters.weeks) return;
+
+    axios.get('https://dashboard.aiswaryasathyan.space/api/facets/', {
+      params: {
+        start_date: filters.startDate,
+        end_date: filters.endDate,
+        cooldown_weeks: filters.cooldownWeeks,
+        weeks: filters.weeks
+      }
+    })
+      .then(response => setFacets(response.data))
+      .catch(err => {
+        console.error("Error fetching facets:", err);
+        setFacets(null);
+      });
+  }, [filters.startDate, filters.endDate, filters.cooldownWeeks, filters.weeks]);
+
+  // 4. Fetch Chart and KPI Data
   useEffect(() => {
     // Guard against initial empty states
     if (!filters.startDate || !filters.endDate || !filters.weeks) return;
@@ -132,6 +152,14 @@ const StaggeredChart = ({ onNavigate }) => {
 
   // --- UI LOGIC ---
 
+  // True when the sector/mcap pair has no rows for the current filters
+  const isOptionEmpty = (sector, mcap) => {
+    if (!facets || (sector === 'All' && mcap === 'All')) return false;
+    if (sector === 'All') return !facets.mcaps?.[mcap];
+    if (mcap === 'All') return !facets.sectors?.[sector];
+    return !facets.combinations?.[sector]?.[mcap];
+  };
+
   useEffect(() => {
     const updateHeight = () => {
       if (chartContainerRef.current) {
@@ -226,7 +254,7 @@ const StaggeredChart = ({ onNavigate }) => {
           <label style={labelStyle}>Sector</label>
           <select name="sector" value={filters.sector} onChange={handleFilterChange} style={inputStyle}>
             {sectors.map(sect => (
-              <option key={sect} value={sect} style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>{sect}</option>
+              <option key={sect} value={sect} disabled={isOptionEmpty(sect, filters.mcap)} style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>{sect}</option>
             ))}
           </select>
         </div>
@@ -235,10 +263,10 @@ const StaggeredChart = ({ onNavigate }) => {
           <label style={labelStyle}>Market Cap</label>
           <select name="mcap" value={filters.mcap} onChange={handleFilterChange} style={inputStyle}>
             <option value="All" style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>All Categories</option>
-            <option value="Mega" style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>Mega Cap</option>
-            <option value="Large" style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>Large Cap</option>
-            <option value="Mid" style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>Mid Cap</option>
-            <option value="Small" style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>Small Cap</option>
+            <option value="Mega" disabled={isOptionEmpty(filters.sector, 'Mega')} style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>Mega Cap</option>
+            <option value="Large" disabled={isOptionEmpty(filters.sector, 'Large')} style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>Large Cap</option>
+            <option value="Mid" disabled={isOptionEmpty(filters.sector, 'Mid')} style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>Mid Cap</option>
+            <option value="Small" disabled={isOptionEmpty(filters.sector, 'Small')} style={{ backgroundColor: '#020617', color: '#e5e7eb' }}>Small Cap</option>
           </select>
         </div>
 
@@ -1,4 +1,7 @@
 import os
+import sys
+from collections import Counter
+
 import pandas as pd
 import django
 from django.conf import settings
@@ -7,44 +10,51 @@ from django.conf import settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
-from analytics.models import TradingData
+from django.db import transaction
+
+from analytics.models import QuarantinedRow, TradingData
+from analytics.caching import bump_dataset_version
+from analytics.derived import add_derived_columns
+from analytics.snapshot import write_snapshot
+from analytics.mcap import latest_mcap_map, read_mcap_file
+from analytics.validation import REASONS, IngestValidationError, summarize_reasons, validate_chunk
+
+# A file with more rejected rows than this is not loaded at all
+MAX_REJECT_RATIO = 0.05
+# Symbols missing from the mcap snapshot have their own, looser limit: they
+# say more about the snapshot than about the file
+MAX_UNKNOWN_RATIO = 0.5
 
 def get_mcap_map():
     print("📋 Loading MCAP categories...")
-    mcap_file = os.path.join(settings.BASE_DIR, "data", "MCAP-NSE-0711.csv")
-    mcap_df = pd.read_csv(mcap_file)
-    mcap_df["Market Capitalisation"] = pd.to_numeric(
-        mcap_df["Market Capitalisation"].astype(str).str.replace(",", "", regex=True), 
-        errors="coerce"
-    )
-    mcap_df = mcap_df.sort_values(by="Market Capitalisation", ascending=False).reset_index(drop=True)
+    # Prefer the newest snapshot loaded with `manage.py load_mcap_snapshot`
+    mcap_map = latest_mcap_map()
+    if mcap_map is not None:
+        return mcap_map
 
-    def get_category(rank):
-        if rank < 50: return "Mega"
-        if rank < 100: return "Large"
-        if rank < 250: return "Mid"
-        if rank < 500: return "Small"
-        return "Micro"
-
-    mcap_df["mcap_category"] = mcap_df.index.map(get_category)
-    return dict(zip(mcap_df["NSE Symbol"], mcap_df["mcap_category"]))
+    mcap_file = os.path.join(settings.BASE_DIR, "data", "MCAP-NSE-0711.csv")
+    mcap_df = read_mcap_file(mcap_file)
+    return dict(zip(mcap_df["symbol"], mcap_df["mcap_category"]))
 
-def ingest_file(file_path, holding_weeks, mcap_map):
+def ingest_file(file_path, holding_weeks, mcap_map, quarantined):
     print(f"🚀 Processing {file_path} ({holding_weeks} weeks)...")
-    
+    source = os.path.basename(file_path)
+    stats = Counter()
+    seen_keys = set()
+
     # Check if Excel or CSV
     if file_path.endswith('.xlsx'):
         df = pd.read_excel(file_path, engine="openpyxl")
+        process_chunk(df, holding_weeks, mcap_map, seen_keys, stats, quarantined, source)
     else:
         # For millions of rows, we read in chunks to save RAM
         chunk_reader = pd.read_csv(file_path, chunksize=50000)
         for chunk in chunk_reader:
-            process_chunk(chunk, holding_weeks, mcap_map)
-        return
+            process_chunk(chunk, holding_weeks, mcap_map, seen_keys, stats, quarantined, source)
 
-    process_chunk(df, holding_weeks, mcap_map)
+    return stats
 
-def process_chunk(df, holding_weeks, mcap_map):
+def process_chunk(df, holding_weeks, mcap_map, seen_keys, stats, quarantined, source):
     # Normalize columns
     df.columns = [str(c).strip() for c in df.columns]
     
@@ -57,39 +67,88 @@ def process_chunk(df, holding_weeks, mcap_map):
     }
     df = df.rename(columns=rename_map)
 
-    objs = []
-    for _, row in df.iterrows():
-        # Exclude Microcaps immediately
-        mcap = mcap_map.get(row['sym'], "Micro")
-        if mcap == "Micro":
-            continue
+    # Whole-column checks before anything from this chunk is written
+    valid, rejected = validate_chunk(df, mcap_map, seen_keys)
+    stats['rows'] += len(df)
+    stats['quarantined'] += len(rejected)
+    stats['invalid'] += int((rejected['reasons'] != 'unknown_symbol').sum())
+    stats.update(summarize_reasons(rejected))
+
+    raw_columns = [c for c in rejected.columns if c != 'reasons']
+    raw = rejected[raw_columns].astype(str).astype(object).where(rejected[raw_columns].notna(), None)
+    quarantined.extend(
+        QuarantinedRow(
+            source_file=source,
+            row_number=int(index) + 2,
+            holding_weeks=holding_weeks,
+            reasons=reasons,
+            raw=values,
+        )
+        for index, reasons, values in zip(rejected.index, rejected['reasons'], raw.to_dict('records'))
+    )
 
+    # Fail fast: a broken file shouldn't be discovered after minutes of inserts
+    if stats['invalid'] > MAX_REJECT_RATIO * stats['rows']:
+        raise IngestValidationError(
+            f"{stats['invalid']:,} of {stats['rows']:,} rows invalid "
+            f"(limit {MAX_REJECT_RATIO:.0%})"
+        )
+    if stats['unknown_symbol'] > MAX_UNKNOWN_RATIO * stats['rows']:
+        raise IngestValidationError(
+            f"{stats['unknown_symbol']:,} of {stats['rows']:,} symbols missing from the mcap snapshot "
+            f"(limit {MAX_UNKNOWN_RATIO:.0%})"
+        )
+
+    # Exclude Microcaps immediately
+    micro = valid['mcap'] == "Micro"
+    stats['micro'] += int(micro.sum())
+    valid = valid[~micro].copy()
+
+    # Derived columns for the whole chunk at once
+    valid = add_derived_columns(valid, duration='dur', returns='ret')
+    company = valid['comp'] if 'comp' in valid else pd.Series('', index=valid.index)
+    sector = valid['sect'] if 'sect' in valid else pd.Series('Other', index=valid.index)
+
+    objs = []
+    columns = ['sym', 'cool', 'mcap', 'date', 'dur', 'ret', 'duration_rounded', 'return_bucket', 'is_success', 'is_big_win']
+    for row, comp, sect in zip(valid[columns].itertuples(index=False), company, sector):
         objs.append(TradingData(
-            symbol=row['sym'],
-            company=row.get('comp', ''),
-            sector=row.get('sect', 'Other'),
-            cooldown_setting=int(row['cool']),
+            symbol=row.sym,
+            company=comp,
+            sector=sect,
+            cooldown_setting=row.cool,
             holding_weeks=holding_weeks,
-            mcap_category=mcap,
-            breakout_date=pd.to_datetime(row['date']).date(),
-            duration=float(row['dur']),
-            return_percentage=float(row['ret'])
+            mcap_category=row.mcap,
+            breakout_date=row.date,
+            duration=row.dur,
+            return_percentage=row.ret,
+            duration_rounded=row.duration_rounded,
+            return_bucket=row.return_bucket,
+            is_success=row.is_success,
+            is_big_win=row.is_big_win
         ))
 
         # Batch insert every 5,000 records to keep memory stable
         if len(objs) >= 5000:
             TradingData.objects.bulk_create(objs)
+            stats['inserted'] += len(objs)
             objs = []
             print(f"  ✅ Inserted 5,000 rows...")
 
     if objs:
         TradingData.objects.bulk_create(objs)
+        stats['inserted'] += len(objs)
 
-def run():
-    # Clear old data (Optional: remove if you want to append)
-    print("🗑️ Clearing existing data...")
-    TradingData.objects.all().delete()
+def print_report(filename, stats):
+    print(
+        f"  📊 {filename}: {stats['rows']:,} rows, {stats['inserted']:,} inserted, "
+        f"{stats['micro']:,} microcaps skipped, {stats['quarantined']:,} quarantined"
+    )
+    for reason in REASONS:
+        if stats[reason]:
+            print(f"     - {reason}: {stats[reason]:,}")
 
+def run():
     mcap_map = get_mcap_map()
     data_dir = os.path.join(settings.BASE_DIR, "data")
 
@@ -105,13 +164,48 @@ def run():
         # Add your other CSV names here
     ]
 
-    for filename, weeks in files_to_process:
-        path = os.path.join(data_dir, filename)
-        if os.path.exists(path):
-            ingest_file(path, weeks, mcap_map)
-        else:
-            print(f"⚠️ Skipping {filename} (File not found)")
-
+    totals = Counter()
+    quarantined = []
+    failure = None
+
+    # Clearing and loading share one transaction: if any file fails, the
+    # previous data stays exactly as it was
+    with transaction.atomic():
+        # Clear old data (Optional: remove if you want to append)
+        print("🗑️ Clearing existing data...")
+        TradingData.objects.all().delete()
+        QuarantinedRow.objects.all().delete()
+
+        for filename, weeks in files_to_process:
+            path = os.path.join(data_dir, filename)
+            if not os.path.exists(path):
+                print(f"⚠️ Skipping {filename} (File not found)")
+                continue
+
+            try:
+                stats = ingest_file(path, weeks, mcap_map, quarantined)
+            except IngestValidationError as e:
+                failure = f"{filename} rejected: {e}"
+                transaction.set_rollback(True)
+                break
+            print_report(filename, stats)
+            totals.update(stats)
+
+    # Rejected rows are kept even when the run is rolled back, to show why it failed
+    QuarantinedRow.objects.bulk_create(quarantined, batch_size=5000)
+
+    if failure:
+        sys.exit(
+            f"🛑 {failure}. Nothing was changed; this run's {len(quarantined):,} rejected rows "
+            f"were added to analytics_quarantinedrow"
+        )
+
+    print_report("Total", totals)
+    print(f"  🔎 Rejected rows are in analytics_quarantinedrow ({len(quarantined):,} rows)")
+
+    version = bump_dataset_version()
+    print("📸 Writing shared snapshot...")
+    write_snapshot(version)
     print("🏁 Ingestion complete!")
 
 if __name__ == "__main__":